@@ -37,8 +37,12 @@ def build_home_page() -> None:
         df_stations = load_stations(session)
         df_railways = load_railways(session)
 
+    # Aggregate once and share between statistics and summaries
+    place_type_counts = df_places["TYPE"].value_counts() if not df_places.empty else None
+    railway_type_counts = df_railways["TYPE"].value_counts() if not df_railways.empty else None
+
     # Display statistics
-    _render_statistics(df_places, df_stations, df_railways)
+    _render_statistics(df_places, df_stations, df_railways, place_type_counts, railway_type_counts)
 
     # Display map
     st.subheader("Map Overview")
@@ -46,10 +50,12 @@ def build_home_page() -> None:
     st.pydeck_chart(deck, key="home_map")
 
     # Display data summaries
-    _render_data_summaries(df_places, df_stations, df_railways)
+    _render_data_summaries(df_places, df_stations, place_type_counts, railway_type_counts)
 
 
-def _render_statistics(df_places, df_stations, df_railways) -> None:
+def _render_statistics(
+    df_places, df_stations, df_railways, place_type_counts, railway_type_counts
+) -> None:
     """Render statistics cards for the loaded data."""
     st.subheader("Data Statistics")
 
@@ -61,10 +67,9 @@ def _render_statistics(df_places, df_stations, df_railways) -> None:
             value=f"{len(df_places):,}",
             help="Total number of cities, airports, and other places"
         )
-        if not df_places.empty:
-            place_types = df_places["TYPE"].value_counts()
+        if place_type_counts is not None:
             st.write("**Top Types:**")
-            for place_type, count in place_types.head(3).items():
+            for place_type, count in place_type_counts.head(3).items():
                 st.write(f"- {place_type}: {count}")
 
     with col2:
@@ -83,28 +88,27 @@ def _render_statistics(df_places, df_stations, df_railways) -> None:
             value=f"{len(df_railways):,}",
             help="Total number of railway lines"
         )
-        if not df_railways.empty:
-            railway_types = df_railways["TYPE"].value_counts()
+        if railway_type_counts is not None:
             st.write("**Top Types:**")
-            for railway_type, count in railway_types.head(3).items():
+            for railway_type, count in railway_type_counts.head(3).items():
                 st.write(f"- {railway_type}: {count}")
 
 
-def _render_data_summaries(df_places, df_stations, df_railways) -> None:
+def _render_data_summaries(df_places, df_stations, place_type_counts, railway_type_counts) -> None:
     """Render expandable data summaries."""
     st.subheader("Data Summaries")
 
     with st.expander("Places Distribution by Type", expanded=False):
-        if not df_places.empty:
-            type_counts = df_places["TYPE"].value_counts().reset_index()
+        if place_type_counts is not None:
+            type_counts = place_type_counts.reset_index()
             type_counts.columns = ["Type", "Count"]
             st.dataframe(type_counts, use_container_width=True, hide_index=True)
         else:
             st.info("No places data available.")
 
     with st.expander("Railway Lines by Type", expanded=False):
-        if not df_railways.empty:
-            railway_counts = df_railways["TYPE"].value_counts().reset_index()
+        if railway_type_counts is not None:
+            railway_counts = railway_type_counts.reset_index()
             railway_counts.columns = ["Type", "Count"]
             st.dataframe(railway_counts, use_container_width=True, hide_index=True)
         else:
@@ -116,15 +120,17 @@ def _render_data_summaries(df_places, df_stations, df_railways) -> None:
 
         with col1:
             if not df_places.empty:
+                bbox = df_places[["LATITUDE", "LONGITUDE"]].agg(["min", "max"])
                 st.write("**Places:**")
-                st.write(f"- Latitude range: {df_places['LATITUDE'].min():.2f} to {df_places['LATITUDE'].max():.2f}")
-                st.write(f"- Longitude range: {df_places['LONGITUDE'].min():.2f} to {df_places['LONGITUDE'].max():.2f}")
+                st.write(f"- Latitude range: {bbox.at['min', 'LATITUDE']:.2f} to {bbox.at['max', 'LATITUDE']:.2f}")
+                st.write(f"- Longitude range: {bbox.at['min', 'LONGITUDE']:.2f} to {bbox.at['max', 'LONGITUDE']:.2f}")
 
         with col2:
             if not df_stations.empty:
+                bbox = df_stations[["LATITUDE", "LONGITUDE"]].agg(["min", "max"])
                 st.write("**Stations:**")
-                st.write(f"- Latitude range: {df_stations['LATITUDE'].min():.2f} to {df_stations['LATITUDE'].max():.2f}")
-                st.write(f"- Longitude range: {df_stations['LONGITUDE'].min():.2f} to {df_stations['LONGITUDE'].max():.2f}")
+                st.write(f"- Latitude range: {bbox.at['min', 'LATITUDE']:.2f} to {bbox.at['max', 'LATITUDE']:.2f}")
+                st.write(f"- Longitude range: {bbox.at['min', 'LONGITUDE']:.2f} to {bbox.at['max', 'LONGITUDE']:.2f}")
 
 
 if __name__ == "__main__":
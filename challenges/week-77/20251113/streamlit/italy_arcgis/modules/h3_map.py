@@ -4,36 +4,49 @@ This module provides H3 hexagon grid visualization, density analysis,
 and coverage analysis using Snowflake's H3 functions and pydeck.
 """
 
+import math
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 import pydeck
+import streamlit as st
 
 from modules.h3_settings import (
-    H3_COVERAGE_COVERED,
-    H3_COVERAGE_UNCOVERED,
-    H3_DENSITY_COLORS,
+    H3_AVG_EDGE_LENGTH_KM,
+    H3_COVERAGE_COLOR_LUT,
+    H3_DENSITY_CATEGORY_LUT,
+    H3_DENSITY_COLOR_LUT,
     H3_GRID_COLOR,
 )
+from modules.map import single_icon_atlas
 from modules.settings import (
+    DATA_CACHE_TTL_SECONDS,
     DEFAULT_MAP_LATITUDE,
     DEFAULT_MAP_LONGITUDE,
     DEFAULT_MAP_ZOOM,
+    PLACES_ICON_SIZE_PX,
     PLACES_ICON_URL,
+    STATIONS_ICON_SIZE_PX,
     STATIONS_ICON_URL,
     TABLE_PLACES,
     TABLE_POINTS,
 )
-from modules.utils import get_logger
+from modules.utils import clear_on_refresh, get_logger
 
 logger = get_logger(__name__)
 
 
-def load_h3_grid_data(session, resolution: int) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, persist="disk")
+def load_h3_grid_data(_session, resolution: int) -> pd.DataFrame:
     """Load H3 grid cells covering Italy.
 
+    The grid only depends on the resolution and the static places table, so
+    results are persisted to disk and survive server restarts (persisted
+    caches ignore ttl; clear them with `streamlit cache clear`).
+
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
         resolution: H3 resolution (0-15)
 
     Returns:
@@ -46,28 +59,31 @@ def load_h3_grid_data(session, resolution: int) -> pd.DataFrame:
     WHERE geography IS NOT NULL
     """
 
-    df = session.sql(sql).to_pandas()
+    # The session is shared by every page and user, so queries are tagged
+    # per statement rather than through session.query_tag
+    query_tag = f"h3_demo:grid:res={resolution}"
 
-    # Ensure column name is uppercase for consistency
-    if 'h3_cell' in df.columns:
-        df.rename(columns={'h3_cell': 'H3_CELL'}, inplace=True)
+    # Unquoted aliases are returned upper-cased by Snowflake (H3_CELL),
+    # so the loaders below need no client-side column renaming
+    df = _session.sql(sql).to_pandas(statement_params={"QUERY_TAG": query_tag})
 
     # Log sample data for debugging
     if not df.empty:
         logger.info(f"Loaded {len(df)} H3 cells at resolution {resolution}")
         logger.info(f"Sample H3 cell IDs: {df['H3_CELL'].head(3).tolist()}")
-        logger.info(f"H3_CELL dtype: {df['H3_CELL'].dtype}")
+        logger.debug(f"H3_CELL dtype: {df['H3_CELL'].dtype}")
     else:
         logger.warning(f"No H3 cells loaded at resolution {resolution}")
 
     return df
 
 
-def load_h3_density_data(session, resolution: int) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_h3_density_data(_session, resolution: int) -> pd.DataFrame:
     """Load H3 grid with city density counts.
 
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
         resolution: H3 resolution (0-15)
 
     Returns:
@@ -85,20 +101,24 @@ def load_h3_density_data(session, resolution: int) -> pd.DataFrame:
     ORDER BY city_count DESC
     """
 
-    df = session.sql(sql).to_pandas()
-
-    # Ensure column names are uppercase
-    df.columns = df.columns.str.upper()
+    query_tag = f"h3_demo:density:res={resolution}"
+    df = _session.sql(sql).to_pandas(statement_params={"QUERY_TAG": query_tag})
+    df["CITY_COUNT"] = df["CITY_COUNT"].astype(np.int32)
 
     logger.info(f"Loaded {len(df)} H3 cells with density data at resolution {resolution}")
     return df
 
 
-def load_city_locations(session) -> pd.DataFrame:
+@clear_on_refresh
+@st.cache_resource(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_city_locations(_session) -> pd.DataFrame:
     """Load city locations for icon layer.
 
+    The table is small and static, so one shared DataFrame is kept per
+    process instead of a copy per call; callers must not modify it.
+
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
 
     Returns:
         DataFrame with city coordinates
@@ -116,18 +136,22 @@ def load_city_locations(session) -> pd.DataFrame:
         AND geography IS NOT NULL
     """
 
-    df = session.sql(sql).to_pandas()
-    df.columns = df.columns.str.upper()
+    query_tag = "h3_demo:cities"
+    df = _session.sql(sql).to_pandas(statement_params={"QUERY_TAG": query_tag})
 
     logger.info(f"Loaded {len(df)} city locations for icon layer")
     return df
 
 
-def load_station_locations(session) -> pd.DataFrame:
+@clear_on_refresh
+@st.cache_resource(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_station_locations(_session) -> pd.DataFrame:
     """Load station location data for icon layer.
 
+    Shared like load_city_locations; callers must not modify the result.
+
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
 
     Returns:
         DataFrame with station coordinates
@@ -145,18 +169,19 @@ def load_station_locations(session) -> pd.DataFrame:
         AND geography IS NOT NULL
     """
 
-    df = session.sql(sql).to_pandas()
-    df.columns = df.columns.str.upper()
+    query_tag = "h3_demo:stations"
+    df = _session.sql(sql).to_pandas(statement_params={"QUERY_TAG": query_tag})
 
     logger.info(f"Loaded {len(df)} station locations for icon layer")
     return df
 
 
-def load_h3_coverage_data(session, resolution: int, radius_km: float) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_h3_coverage_data(_session, resolution: int, radius_km: float) -> pd.DataFrame:
     """Load H3 coverage analysis for railway stations.
 
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
         resolution: H3 resolution (0-15)
         radius_km: Coverage radius in kilometers
 
@@ -165,41 +190,62 @@ def load_h3_coverage_data(session, resolution: int, radius_km: float) -> pd.Data
     """
 
     # Get covered cells (near stations)
-    # Use ST_DWITHIN with CROSS JOIN approach
+    # Each station only needs to be checked against the cells in its
+    # H3_GRID_DISK neighborhood instead of every cell in Italy
     # ST_DWITHIN expects distance in meters
     radius_m = int(radius_km * 1000)
+    k = _coverage_grid_disk_k(resolution, radius_km)
     sql_covered = f"""
-    WITH all_italy_cells AS (
+    WITH stations AS (
+        -- Single scan of station points, reused for the cell set and the
+        -- neighborhood expansion below
+        SELECT
+            geography AS station_geo,
+            H3_POINT_TO_CELL(geography, {resolution}) AS station_cell_int
+        FROM {TABLE_POINTS}
+        WHERE type = 'station' AND geography IS NOT NULL
+    ),
+    all_italy_cells AS (
         -- Generate H3 cells from both places (cities) and points (stations)
         -- to ensure complete coverage of Italy
-        SELECT DISTINCT
-            H3_POINT_TO_CELL(geography, {resolution}) AS h3_cell_int,
-            H3_POINT_TO_CELL_STRING(geography, {resolution}) AS h3_cell
-        FROM {TABLE_PLACES}
-        WHERE geography IS NOT NULL
-
-        UNION
-
-        SELECT DISTINCT
-            H3_POINT_TO_CELL(geography, {resolution}) AS h3_cell_int,
-            H3_POINT_TO_CELL_STRING(geography, {resolution}) AS h3_cell
-        FROM {TABLE_POINTS}
-        WHERE geography IS NOT NULL AND type = 'station'
+        SELECT
+            h3_cell_int,
+            H3_INT_TO_STRING(h3_cell_int) AS h3_cell
+        FROM (
+            SELECT H3_POINT_TO_CELL(geography, {resolution}) AS h3_cell_int
+            FROM {TABLE_PLACES}
+            WHERE geography IS NOT NULL
+
+            UNION
+
+            SELECT station_cell_int
+            FROM stations
+        )
     ),
-    stations AS (
-        SELECT geography AS station_geo
-        FROM {TABLE_POINTS}
-        WHERE type = 'station'
+    cell_centroids AS (
+        -- Compute each cell's centroid once rather than once per station pair
+        SELECT
+            h3_cell,
+            h3_cell_int,
+            ST_CENTROID(H3_CELL_TO_BOUNDARY(h3_cell_int)) AS cell_centroid
+        FROM all_italy_cells
+    ),
+    station_neighbors AS (
+        SELECT
+            s.station_geo,
+            d.value::INTEGER AS h3_cell_int
+        FROM stations s,
+            LATERAL FLATTEN(INPUT => H3_GRID_DISK(s.station_cell_int, {k})) d
     ),
     cell_station_pairs AS (
         SELECT DISTINCT
             c.h3_cell,
             c.h3_cell_int
-        FROM all_italy_cells c
-        CROSS JOIN stations s
+        FROM cell_centroids c
+        JOIN station_neighbors n ON c.h3_cell_int = n.h3_cell_int
         WHERE ST_DWITHIN(
-            ST_CENTROID(H3_CELL_TO_BOUNDARY(c.h3_cell_int)),
-            s.station_geo,
+            c.cell_centroid,
+            n.station_geo,
             {radius_m}
         )
     )
@@ -210,12 +256,11 @@ def load_h3_coverage_data(session, resolution: int, radius_km: float) -> pd.Data
     LEFT JOIN cell_station_pairs p ON a.h3_cell = p.h3_cell
     """
 
-    df = session.sql(sql_covered).to_pandas()
-
-    # Ensure column names are uppercase
-    df.columns = df.columns.str.upper()
+    query_tag = f"h3_demo:coverage:res={resolution}"
+    df = _session.sql(sql_covered).to_pandas(statement_params={"QUERY_TAG": query_tag})
+    df["IS_COVERED"] = df["IS_COVERED"].astype(np.int8)
 
-    covered_count = df[df["IS_COVERED"] == 1].shape[0]
+    covered_count = int(np.count_nonzero(df["IS_COVERED"].to_numpy()))
     total_count = len(df)
     coverage_rate = (covered_count / total_count * 100) if total_count > 0 else 0
 
@@ -227,6 +272,41 @@ def load_h3_coverage_data(session, resolution: int, radius_km: float) -> pd.Data
     return df
 
 
+def _coverage_grid_disk_k(resolution: int, radius_km: float) -> int:
+    """Return the H3_GRID_DISK size that contains every cell whose centroid
+    can lie within radius_km of a station.
+
+    The station's own cell centroid is at most one edge length away, and
+    each ring of a hexagonal grid moves at least 1.5 edge lengths outward.
+    One extra ring absorbs H3's edge-length distortion across the globe.
+
+    Args:
+        resolution: H3 resolution (0-15)
+        radius_km: Coverage radius in kilometers
+
+    Returns:
+        Grid distance k to pass to H3_GRID_DISK
+    """
+    edge_km = H3_AVG_EDGE_LENGTH_KM[resolution]
+    return math.ceil((radius_km + edge_km) / (1.5 * edge_km)) + 1
+
+
+def _layer_records(df: pd.DataFrame, columns: List[str]) -> List[Dict[str, Any]]:
+    """Convert only the columns a layer reads into pydeck records.
+
+    pydeck turns a DataFrame into records anyway; selecting the columns
+    first keeps unused ones out of the JSON sent to the browser.
+
+    Args:
+        df: Source DataFrame
+        columns: Columns used by the layer's accessors and tooltip
+
+    Returns:
+        List of row dictionaries
+    """
+    return df[columns].to_dict(orient="records")
+
+
 def build_h3_grid_deck(df_h3: pd.DataFrame, resolution: int) -> pydeck.Deck:
     """Build pydeck.Deck for H3 grid visualization.
 
@@ -237,14 +317,11 @@ def build_h3_grid_deck(df_h3: pd.DataFrame, resolution: int) -> pydeck.Deck:
     Returns:
         Configured pydeck.Deck instance
     """
-    # Ensure H3_CELL column exists and is string type
+    # H3_CELL is already a hex string (H3_POINT_TO_CELL_STRING in the loader)
     if 'H3_CELL' not in df_h3.columns:
         logger.warning(f"H3_CELL column not found. Available columns: {df_h3.columns.tolist()}")
         return pydeck.Deck()
 
-    # Convert H3 cell IDs to string if they aren't already
-    df_h3['H3_CELL'] = df_h3['H3_CELL'].astype(str)
-
     view_state = pydeck.ViewState(
         latitude=DEFAULT_MAP_LATITUDE,
         longitude=DEFAULT_MAP_LONGITUDE,
@@ -255,7 +332,7 @@ def build_h3_grid_deck(df_h3: pd.DataFrame, resolution: int) -> pydeck.Deck:
 
     layer = pydeck.Layer(
         "H3HexagonLayer",
-        df_h3,
+        _layer_records(df_h3, ["H3_CELL"]),
         get_hexagon="H3_CELL",
         get_fill_color=H3_GRID_COLOR,
         get_line_color=[80, 80, 80, 100],
@@ -298,39 +375,25 @@ def build_h3_density_deck(
         logger.warning("Cannot build density deck: empty data or missing H3_CELL column")
         return pydeck.Deck()
 
-    # Convert H3 cell IDs to string
-    df_density['H3_CELL'] = df_density['H3_CELL'].astype(str)
-
     # Calculate density thresholds based on percentages
     max_count = df_density["CITY_COUNT"].max() if not df_density.empty else 1
     low_threshold = max_count * (low_threshold_pct / 100.0)
     high_threshold = max_count * (high_threshold_pct / 100.0)
 
-    # Assign colors and density information
-    def get_density_color(count: int) -> List[int]:
-        if count >= high_threshold:
-            return H3_DENSITY_COLORS["high"]
-        elif count >= low_threshold:
-            return H3_DENSITY_COLORS["medium"]
-        else:
-            return H3_DENSITY_COLORS["low"]
-
-    def get_density_category(count: int) -> str:
-        if count >= high_threshold:
-            return "High"
-        elif count >= low_threshold:
-            return "Medium"
-        else:
-            return "Low"
-
-    def get_density_percentage(count: int) -> float:
-        return (count / max_count * 100.0) if max_count > 0 else 0.0
-
-    df_density["COLOR"] = df_density["CITY_COUNT"].apply(get_density_color)
-    df_density["DENSITY_CATEGORY"] = df_density["CITY_COUNT"].apply(get_density_category)
-    df_density["DENSITY_PCT"] = df_density["CITY_COUNT"].apply(get_density_percentage)
+    # Classify all cells at once: 0 = low, 1 = medium, 2 = high
+    # (high is checked first so it wins when low_threshold > high_threshold)
+    counts = df_density["CITY_COUNT"].to_numpy()
+    category_idx = np.select(
+        [counts >= high_threshold, counts >= low_threshold], [2, 1], default=0
+    )
+
+    df_density["COLOR"] = H3_DENSITY_COLOR_LUT[category_idx].tolist()
+    df_density["DENSITY_CATEGORY"] = H3_DENSITY_CATEGORY_LUT[category_idx]
+    df_density["DENSITY_PCT"] = (
+        counts * (100.0 / max_count) if max_count > 0 else np.zeros(len(counts))
+    )
     # Format percentage as string for tooltip display (PyDeck doesn't support format specifiers)
-    df_density["DENSITY_PCT_STR"] = df_density["DENSITY_PCT"].apply(lambda x: f"{x:.1f}")
+    df_density["DENSITY_PCT_STR"] = np.char.mod("%.1f", df_density["DENSITY_PCT"].to_numpy())
 
     view_state = pydeck.ViewState(
         latitude=DEFAULT_MAP_LATITUDE,
@@ -343,7 +406,10 @@ def build_h3_density_deck(
     # H3 hexagon layer with tooltip
     h3_layer = pydeck.Layer(
         "H3HexagonLayer",
-        df_density,
+        _layer_records(
+            df_density,
+            ["H3_CELL", "COLOR", "CITY_COUNT", "DENSITY_PCT_STR", "DENSITY_CATEGORY"],
+        ),
         get_hexagon="H3_CELL",
         get_fill_color="COLOR",
         get_line_color=[60, 60, 60, 120],
@@ -362,20 +428,12 @@ def build_h3_density_deck(
 
     if show_city_icons and not df_cities.empty:
         logger.info(f"Adding city icon layer with {len(df_cities)} cities")
-        # Prepare icon data for cities using the same icon as places
-        icon_data = {
-            "url": PLACES_ICON_URL,
-            "width": 100,
-            "height": 100,
-            "anchorY": 100,
-        }
-        df_cities["ICON_DATA"] = [icon_data] * len(df_cities)
-
+        # Cities use the same icon as places, shared through a single-icon atlas
         city_icon_layer = pydeck.Layer(
             "IconLayer",
-            df_cities,
+            _layer_records(df_cities, ["LONGITUDE", "LATITUDE"]),
             get_position=["LONGITUDE", "LATITUDE"],
-            get_icon="ICON_DATA",
+            **single_icon_atlas(PLACES_ICON_URL, PLACES_ICON_SIZE_PX),
             get_size=4,
             size_scale=8,
             size_min_pixels=6,
@@ -424,16 +482,9 @@ def build_h3_coverage_deck(
         logger.warning("Cannot build coverage deck: empty data or missing H3_CELL column")
         return pydeck.Deck()
 
-    # Convert H3 cell IDs to string
-    df_coverage['H3_CELL'] = df_coverage['H3_CELL'].astype(str)
-
     # Assign colors based on coverage status
-    def get_coverage_color(is_covered: int) -> List[int]:
-        return H3_COVERAGE_COVERED if is_covered == 1 else H3_COVERAGE_UNCOVERED
-
-    df_coverage["COLOR"] = df_coverage["IS_COVERED"].apply(
-        lambda x: get_coverage_color(x)
-    )
+    is_covered = (df_coverage["IS_COVERED"].to_numpy() == 1).astype(np.intp)
+    df_coverage["COLOR"] = H3_COVERAGE_COLOR_LUT[is_covered].tolist()
 
     view_state = pydeck.ViewState(
         latitude=DEFAULT_MAP_LATITUDE,
@@ -446,7 +497,7 @@ def build_h3_coverage_deck(
     # H3 coverage layer
     h3_layer = pydeck.Layer(
         "H3HexagonLayer",
-        df_coverage,
+        _layer_records(df_coverage, ["H3_CELL", "COLOR", "IS_COVERED"]),
         get_hexagon="H3_CELL",
         get_fill_color="COLOR",
         get_line_color=[40, 40, 40, 80],
@@ -461,19 +512,11 @@ def build_h3_coverage_deck(
 
     # Add station icon layer if data is available
     if not df_stations.empty:
-        icon_data = {
-            "url": STATIONS_ICON_URL,
-            "width": 256,
-            "height": 256,
-            "anchorY": 256,
-        }
-        df_stations["ICON_DATA"] = [icon_data] * len(df_stations)
-
         station_icon_layer = pydeck.Layer(
             "IconLayer",
-            df_stations,
+            _layer_records(df_stations, ["LONGITUDE", "LATITUDE"]),
             get_position=["LONGITUDE", "LATITUDE"],
-            get_icon="ICON_DATA",
+            **single_icon_atlas(STATIONS_ICON_URL, STATIONS_ICON_SIZE_PX),
             get_size=2,
             size_scale=4,
             size_min_pixels=4,
@@ -509,7 +552,7 @@ def calculate_coverage_stats(df_coverage: pd.DataFrame) -> Dict[str, Any]:
         Dictionary with coverage statistics
     """
     total_cells = len(df_coverage)
-    covered_cells = df_coverage[df_coverage["IS_COVERED"] == 1].shape[0]
+    covered_cells = int(np.count_nonzero(df_coverage["IS_COVERED"].to_numpy() == 1))
     uncovered_cells = total_cells - covered_cells
     coverage_rate = (covered_cells / total_cells * 100) if total_cells > 0 else 0
 
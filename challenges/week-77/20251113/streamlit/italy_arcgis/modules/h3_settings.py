@@ -5,11 +5,34 @@ demonstration features, including resolution settings, analysis types,
 and color schemes.
 """
 
+import numpy as np
+
 # H3 resolution settings
 DEFAULT_H3_RESOLUTION = 5
 MIN_H3_RESOLUTION = 3
 MAX_H3_RESOLUTION = 8
 
+# Average H3 hexagon edge length (km) per resolution
+# Used to size the H3_GRID_DISK neighborhood searched around each station
+H3_AVG_EDGE_LENGTH_KM = {
+    0: 1281.256011,
+    1: 483.0568391,
+    2: 182.5129565,
+    3: 68.97922179,
+    4: 26.07175968,
+    5: 9.854090990,
+    6: 3.724532667,
+    7: 1.406475763,
+    8: 0.531414010,
+    9: 0.200786148,
+    10: 0.075863783,
+    11: 0.028663897,
+    12: 0.010830188,
+    13: 0.004092010,
+    14: 0.001546100,
+    15: 0.000584169,
+}
+
 # H3 analysis types
 H3_ANALYSIS_TYPES = {
     "Grid Visualization": "grid",
@@ -38,10 +61,19 @@ DEFAULT_SHOW_CITY_ICONS = False  # Show city pin icons on density heatmap by def
 H3_GRID_COLOR = [100, 149, 237, 80]  # Cornflower blue with transparency
 
 H3_DENSITY_COLORS = {
-    "low": [76, 175, 80, 120],      # Green
-    "medium": [255, 235, 59, 140],  # Yellow
-    "high": [244, 67, 54, 160],     # Red
+    "low": np.array([76, 175, 80, 120], dtype=np.uint8),      # Green
+    "medium": np.array([255, 235, 59, 140], dtype=np.uint8),  # Yellow
+    "high": np.array([244, 67, 54, 160], dtype=np.uint8),     # Red
 }
 
-H3_COVERAGE_COVERED = [33, 150, 243, 140]  # Blue - covered areas
-H3_COVERAGE_UNCOVERED = [158, 158, 158, 60]  # Gray - uncovered areas
+# Lookup tables indexed by density category code (0 = low, 1 = medium, 2 = high)
+H3_DENSITY_COLOR_LUT = np.stack(
+    [H3_DENSITY_COLORS["low"], H3_DENSITY_COLORS["medium"], H3_DENSITY_COLORS["high"]]
+)
+H3_DENSITY_CATEGORY_LUT = np.array(["Low", "Medium", "High"])
+
+H3_COVERAGE_COVERED = np.array([33, 150, 243, 140], dtype=np.uint8)  # Blue - covered areas
+H3_COVERAGE_UNCOVERED = np.array([158, 158, 158, 60], dtype=np.uint8)  # Gray - uncovered areas
+
+# Lookup table indexed by IS_COVERED (0 = uncovered, 1 = covered)
+H3_COVERAGE_COLOR_LUT = np.stack([H3_COVERAGE_UNCOVERED, H3_COVERAGE_COVERED])
@@ -5,27 +5,42 @@ using pydeck with Places (cities, airports, etc.), Stations, and Railways data.
 """
 
 import json
+from functools import partial
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import pydeck
+import streamlit as st
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    # orjson is optional; fall back to the stdlib parser when it is unavailable
+    _json_loads = json.loads
 
 from modules.settings import (
+    DATA_CACHE_TTL_SECONDS,
     DEFAULT_MAP_LATITUDE,
     DEFAULT_MAP_LONGITUDE,
     DEFAULT_MAP_ZOOM,
     PATH_COLOR_RGB,
+    PLACES_ICON_SIZE_PX,
     PLACES_ICON_URL,
     PLACES_TOOLTIP_BG,
     RAILWAYS_TOOLTIP_BG,
+    RAILWAY_SIMPLIFY_TOLERANCE_M,
     SELECTED_PLACE_COLOR_RGB,
+    STATIONS_ICON_SIZE_PX,
     STATIONS_ICON_URL,
     STATIONS_TOOLTIP_BG,
     TABLE_PLACES,
     TABLE_POINTS,
     TABLE_RAILWAYS,
 )
-from modules.utils import get_logger
+from modules.utils import clear_on_refresh, get_data_version, get_logger, run_concurrently
 
 logger = get_logger(__name__)
 
@@ -59,52 +74,97 @@ SELECT
     osm_id,
     name,
     type,
-    ST_ASGEOJSON(geography) AS geojson,
+    ST_ASGEOJSON(ST_SIMPLIFY(geography, {RAILWAY_SIMPLIFY_TOLERANCE_M})) AS geojson,
 FROM {TABLE_RAILWAYS}
 -- LIMIT 1000
 """
 
-
-def load_places(session) -> pd.DataFrame:
-    """Load places data and add visualization columns.
+# Static map styling shared by every build_map_deck call
+_MAP_TOOLTIP = {
+    "html": (
+        "<div style=\"background-color: {TOOLTIP_BG}; padding: 6px; border-radius: 4px; "
+        "color: white; min-width: 140px;\">"
+        "<b>{NAME}</b><br/>Type: {TYPE}<br/>OSM ID: {OSM_ID}"
+        "</div>"
+    ),
+    "style": {
+        "backgroundColor": "rgba(0, 0, 0, 0)",
+        "border": "none",
+        "padding": "0",
+        "fontSize": "12px",
+    },
+}
+_PLACES_SCATTER_COLOR = (255, 159, 54, 100)
+_RAILWAYS_LINE_COLOR = (212, 91, 144, 160)
+_RAILWAY_POINTS_COLOR = (212, 91, 144, 220)
+
+
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_places(_session) -> pd.DataFrame:
+    """Load places data and add tooltip styling.
 
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
 
     Returns:
         DataFrame with places data and visualization columns
     """
-    df_places = session.sql(SQL_PLACES).to_pandas()
+    df_places = _session.sql(SQL_PLACES).to_pandas()
+    df_places["TYPE"] = df_places["TYPE"].astype("category")
     df_places["TOOLTIP_BG"] = PLACES_TOOLTIP_BG
-    df_places["ICON_DATA"] = _build_icon_column(len(df_places), PLACES_ICON_URL)
     return df_places
 
 
-def load_stations(session) -> pd.DataFrame:
-    """Load stations data and add icon and tooltip styling.
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_stations(_session) -> pd.DataFrame:
+    """Load stations data and add tooltip styling.
 
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
 
     Returns:
         DataFrame with stations data and visualization columns
     """
-    df_stations = session.sql(SQL_STATIONS).to_pandas()
+    df_stations = _session.sql(SQL_STATIONS).to_pandas()
+    df_stations["TYPE"] = df_stations["TYPE"].astype("category")
     df_stations["TOOLTIP_BG"] = STATIONS_TOOLTIP_BG
-    df_stations["ICON_DATA"] = _build_icon_column(len(df_stations), STATIONS_ICON_URL)
     return df_stations
 
 
-def load_railways(session) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def load_railways(_session) -> pd.DataFrame:
     """Load railway GeoJSON data from Snowflake.
 
     Args:
-        session: Snowflake session object
+        _session: Snowflake session object (excluded from the cache key)
 
     Returns:
         DataFrame containing railway GeoJSON data
     """
-    return session.sql(SQL_RAILWAYS).to_pandas()
+    df_railways = _session.sql(SQL_RAILWAYS).to_pandas()
+    df_railways["TYPE"] = df_railways["TYPE"].astype("category")
+    return df_railways
+
+
+def load_map_data(session) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Load places, stations and railways concurrently.
+
+    The three queries are independent, so on a cold cache the wait is the
+    slowest query rather than the sum of all three. Cached results are
+    returned almost immediately either way.
+
+    Args:
+        session: Snowflake session object
+
+    Returns:
+        Tuple of (places, stations, railways) DataFrames
+    """
+    df_places, df_stations, df_railways = run_concurrently(
+        partial(load_places, session),
+        partial(load_stations, session),
+        partial(load_railways, session),
+    )
+    return df_places, df_stations, df_railways
 
 
 def build_map_deck(
@@ -128,12 +188,14 @@ def build_map_deck(
         initial_longitude: Initial longitude for map view
         initial_zoom: Initial zoom level
         selected_places: DataFrame of selected places to highlight
-        path_lines: List of line coordinates for path visualization
+        path_lines: List of paths ({"path": [[lon, lat], ...]}) for path visualization
 
     Returns:
         Configured pydeck.Deck instance
     """
-    railways_geojson, df_railway_points = _prepare_railway_layers(df_railways)
+    railways_geojson, df_railway_points = _prepare_railway_layers(
+        df_railways, get_data_version()
+    )
 
     view_state = pydeck.ViewState(
         latitude=initial_latitude,
@@ -148,6 +210,8 @@ def build_map_deck(
         _build_icon_layer(
             df_stations,
             layer_id="stations_icon_layer",
+            icon_url=STATIONS_ICON_URL,
+            icon_size_px=STATIONS_ICON_SIZE_PX,
             size_min_pixels=12,
             size_max_pixels=64,
         ),
@@ -155,6 +219,8 @@ def build_map_deck(
         _build_icon_layer(
             df_places,
             layer_id="places_icon_layer",
+            icon_url=PLACES_ICON_URL,
+            icon_size_px=PLACES_ICON_SIZE_PX,
             size_min_pixels=24,
             size_max_pixels=128,
         ),
@@ -171,64 +237,94 @@ def build_map_deck(
     if path_lines is not None and len(path_lines) > 0:
         layers.append(_build_path_lines_layer(path_lines))
 
-    tooltip = {
-        "html": (
-            "<div style=\"background-color: {TOOLTIP_BG}; padding: 6px; border-radius: 4px; "
-            "color: white; min-width: 140px;\">"
-            "<b>{NAME}</b><br/>Type: {TYPE}<br/>OSM ID: {OSM_ID}"
-            "</div>"
-        ),
-        "style": {
-            "backgroundColor": "rgba(0, 0, 0, 0)",
-            "border": "none",
-            "padding": "0",
-            "fontSize": "12px",
-        },
-    }
+    return pydeck.Deck(initial_view_state=view_state, layers=layers, tooltip=_MAP_TOOLTIP)
+
 
-    return pydeck.Deck(initial_view_state=view_state, layers=layers, tooltip=tooltip)
+def single_icon_atlas(url: str, size_px: int) -> Dict[str, Any]:
+    """Build IconLayer arguments that draw the same icon for every row.
 
+    The icon is declared once as an atlas with a single mapping entry, so
+    no per-row icon column needs to be added to the layer data.
+
+    Args:
+        url: Icon image URL used as the atlas
+        size_px: Width and height of the icon image in pixels
 
-def _build_icon_column(length: int, url: str) -> List[Dict[str, object]]:
-    """Generate icon configuration for IconLayer."""
-    icon_spec = {
-        "url": url,
-        "width": 100,
-        "height": 100,
-        "anchorY": 100,
+    Returns:
+        Keyword arguments for pydeck.Layer("IconLayer", ...)
+    """
+    return {
+        "icon_atlas": url,
+        "icon_mapping": {
+            "marker": {
+                "x": 0,
+                "y": 0,
+                "width": size_px,
+                "height": size_px,
+                "anchorY": size_px,
+                "mask": False,
+            }
+        },
+        "get_icon": "'marker'",
     }
-    return [icon_spec] * length
 
 
+# Shared read-only across reruns. _df_railways is always the load_railways
+# result, so the cache is keyed on the data version instead of hashing the frame
+@clear_on_refresh
+@st.cache_resource(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
 def _prepare_railway_layers(
-    df_railways: pd.DataFrame,
+    _df_railways: pd.DataFrame,
+    data_version: int,
 ) -> Tuple[Dict[str, object], pd.DataFrame]:
-    """Generate GeoJSON FeatureCollection and endpoint DataFrame for railways."""
-    features: List[Dict[str, object]] = []
-    endpoints: List[Dict[str, object]] = []
+    """Generate GeoJSON FeatureCollection and endpoint DataFrame for railways.
 
-    for row in df_railways.itertuples(index=False):
-        geometry = _parse_geometry(row.GEOJSON)
+    Args:
+        _df_railways: Railways from load_railways (excluded from the cache key)
+        data_version: Value of get_data_version(), used as the cache key
+    """
+    features: List[Dict[str, object]] = []
+    # Each railway contributes at most a start and an end point
+    endpoints = _allocate_endpoint_arrays(2 * len(_df_railways))
+    endpoint_count = 0
+    # Identical GeoJSON strings (e.g. duplicated short segments) are parsed once
+    parsed_geometries: Dict[str, Optional[Dict[str, object]]] = {}
+
+    # Iterate plain column values rather than building a namedtuple per row
+    rows = zip(
+        _df_railways["OSM_ID"].tolist(),
+        _df_railways["NAME"].tolist(),
+        _df_railways["TYPE"].tolist(),
+        _df_railways["GEOJSON"].tolist(),
+    )
+    for osm_id, name, railway_type, raw_geojson in rows:
+        if raw_geojson in parsed_geometries:
+            geometry = parsed_geometries[raw_geojson]
+        else:
+            geometry = _parse_geometry(raw_geojson)
+            parsed_geometries[raw_geojson] = geometry
         if not geometry:
             continue
 
-        _collect_endpoints(geometry, row, endpoints)
+        endpoint_count = _collect_endpoints(
+            geometry, osm_id, name, railway_type, endpoints, endpoint_count
+        )
 
         features.append(
             {
                 "type": "Feature",
                 "geometry": geometry,
                 "properties": {
-                    "OSM_ID": row.OSM_ID,
-                    "NAME": row.NAME,
-                    "TYPE": row.TYPE,
+                    "OSM_ID": osm_id,
+                    "NAME": name,
+                    "TYPE": railway_type,
                     "TOOLTIP_BG": RAILWAYS_TOOLTIP_BG,
                 },
             }
         )
 
     geojson = {"type": "FeatureCollection", "features": features}
-    points_df = _build_endpoint_dataframe(endpoints)
+    points_df = _build_endpoint_dataframe(endpoints, endpoint_count)
     return geojson, points_df
 
 
@@ -238,52 +334,78 @@ def _parse_geometry(raw_geojson: Optional[str]) -> Optional[Dict[str, object]]:
         return None
 
     try:
-        return json.loads(raw_geojson)
+        return _json_loads(raw_geojson)
     except (TypeError, json.JSONDecodeError):
         logger.warning("Invalid GeoJSON skipped")
         return None
 
 
+def _allocate_endpoint_arrays(capacity: int) -> Dict[str, np.ndarray]:
+    """Preallocate one array per endpoint column (filled by _collect_endpoints)."""
+    return {
+        # NaN marks a slot whose coordinate was missing or malformed
+        "longitude": np.full(capacity, np.nan),
+        "latitude": np.full(capacity, np.nan),
+        "OSM_ID": np.empty(capacity, dtype=object),
+        "NAME": np.empty(capacity, dtype=object),
+        "TYPE": np.empty(capacity, dtype=object),
+    }
+
+
 def _collect_endpoints(
     geometry: Dict[str, object],
-    row: Any,
-    endpoints: List[Dict[str, object]],
-) -> None:
-    """Extract start and end points from railway geometry for scatter plot."""
+    osm_id: Any,
+    name: Any,
+    railway_type: Any,
+    endpoints: Dict[str, np.ndarray],
+    count: int,
+) -> int:
+    """Write start and end points of a railway geometry into the endpoint arrays.
+
+    Returns:
+        Number of endpoints stored after this geometry
+    """
     coordinates = geometry.get("coordinates")
     geom_type = geometry.get("type")
 
-    def add_point(coord: Optional[List[float]]) -> None:
-        if coord is None or len(coord) < 2:
-            return
-        endpoints.append(
-            {
-                "longitude": coord[0],
-                "latitude": coord[1],
-                "OSM_ID": row.OSM_ID,
-                "NAME": row.NAME,
-                "TYPE": row.TYPE,
-                "TOOLTIP_BG": RAILWAYS_TOOLTIP_BG,
-            }
-        )
+    def add_point(coord: Optional[List[float]], idx: int) -> int:
+        try:
+            endpoints["longitude"][idx] = coord[0]
+            endpoints["latitude"][idx] = coord[1]
+        except (TypeError, IndexError):
+            pass  # Left as NaN and dropped in _build_endpoint_dataframe
+        endpoints["OSM_ID"][idx] = osm_id
+        endpoints["NAME"][idx] = name
+        endpoints["TYPE"][idx] = railway_type
+        return idx + 1
 
     if geom_type == "LineString" and coordinates:
-        add_point(coordinates[0])
-        add_point(coordinates[-1])
+        count = add_point(coordinates[0], count)
+        count = add_point(coordinates[-1], count)
     elif geom_type == "MultiLineString" and coordinates:
         non_empty_lines = [line for line in coordinates if line]
         if not non_empty_lines:
-            return
-        add_point(non_empty_lines[0][0])
-        add_point(non_empty_lines[-1][-1])
+            return count
+        count = add_point(non_empty_lines[0][0], count)
+        count = add_point(non_empty_lines[-1][-1], count)
+    return count
+
 
+def _build_endpoint_dataframe(endpoints: Dict[str, np.ndarray], count: int) -> pd.DataFrame:
+    """Build DataFrame from the filled part of the endpoint arrays.
 
-def _build_endpoint_dataframe(endpoints: List[Dict[str, object]]) -> pd.DataFrame:
-    """Convert endpoint list to DataFrame, return empty DataFrame with columns if empty."""
-    if not endpoints:
-        columns = ["longitude", "latitude", "OSM_ID", "NAME", "TYPE", "TOOLTIP_BG"]
-        return pd.DataFrame(columns=columns)
-    return pd.DataFrame(endpoints)
+    Slots with a NaN coordinate are dropped with a single mask. Columns take
+    their dtypes from the preallocated arrays, so the frame keeps float64
+    coordinates (and its columns) even when it is empty.
+    """
+    longitudes = endpoints["longitude"][:count]
+    latitudes = endpoints["latitude"][:count]
+    valid = ~(np.isnan(longitudes) | np.isnan(latitudes))
+    df_points = pd.DataFrame(
+        {column: values[:count][valid] for column, values in endpoints.items()}, copy=False
+    )
+    df_points["TOOLTIP_BG"] = RAILWAYS_TOOLTIP_BG
+    return df_points
 
 
 def _build_places_scatter_layer(df_places: pd.DataFrame) -> pydeck.Layer:
@@ -292,7 +414,7 @@ def _build_places_scatter_layer(df_places: pd.DataFrame) -> pydeck.Layer:
         "ScatterplotLayer",
         data=df_places,
         get_position=["LONGITUDE", "LATITUDE"],
-        get_fill_color=[255, 159, 54, 100],
+        get_fill_color=_PLACES_SCATTER_COLOR,
         get_radius=100,
         pickable=False,
         id="places_scatter_layer",
@@ -303,6 +425,8 @@ def _build_icon_layer(
     df: pd.DataFrame,
     *,
     layer_id: str,
+    icon_url: str,
+    icon_size_px: int,
     size_min_pixels: int,
     size_max_pixels: int,
 ) -> pydeck.Layer:
@@ -311,7 +435,7 @@ def _build_icon_layer(
         "IconLayer",
         data=df,
         get_position=["LONGITUDE", "LATITUDE"],
-        get_icon="ICON_DATA",
+        **single_icon_atlas(icon_url, icon_size_px),
         get_size=60,
         size_units="meters",
         size_scale=0.5,
@@ -331,7 +455,7 @@ def _build_railways_layer(railways_geojson: Dict[str, object]) -> pydeck.Layer:
         pickable=True,
         stroked=True,
         filled=False,
-        get_line_color=[212, 91, 144, 160],
+        get_line_color=_RAILWAYS_LINE_COLOR,
         get_line_width=2,
         line_width_min_pixels=2,
         id="railways_geojson_layer",
@@ -344,7 +468,7 @@ def _build_railway_points_layer(df_points: pd.DataFrame) -> pydeck.Layer:
         "ScatterplotLayer",
         data=df_points,
         get_position=["longitude", "latitude"],
-        get_fill_color=[212, 91, 144, 220],
+        get_fill_color=_RAILWAY_POINTS_COLOR,
         get_radius=120,
         pickable=True,
         auto_highlight=True,
@@ -377,23 +501,23 @@ def _build_selected_places_layer(df_selected: pd.DataFrame) -> pydeck.Layer:
 
 
 def _build_path_lines_layer(path_lines: List[Dict[str, Any]]) -> pydeck.Layer:
-    """Build LineLayer to visualize the shortest path.
+    """Build PathLayer to visualize the shortest path.
 
     Args:
-        path_lines: List of dicts with 'start' and 'end' coordinates
-                   e.g., [{"start": [lon1, lat1], "end": [lon2, lat2]}, ...]
+        path_lines: List of dicts with an ordered 'path' of coordinates
+                   e.g., [{"path": [[lon1, lat1], [lon2, lat2], ...]}]
 
     Returns:
         pydeck.Layer for path lines visualization
     """
     r, g, b = PATH_COLOR_RGB
     return pydeck.Layer(
-        "LineLayer",
+        "PathLayer",
         data=path_lines,
-        get_source_position="start",
-        get_target_position="end",
+        get_path="path",
         get_color=[r, g, b, 255],
         get_width=5,
+        width_units="'pixels'",
         width_min_pixels=3,
         pickable=False,
         id="path_lines_layer",
@@ -21,6 +21,8 @@ RAILWAYS_TOOLTIP_BG = "rgba(212, 91, 144, 0.8)"
 # Icon URLs
 PLACES_ICON_URL = "https://cdn-icons-png.flaticon.com/512/149/149059.png"
 STATIONS_ICON_URL = "https://cdn-icons-png.flaticon.com/256/149/149060.png"
+PLACES_ICON_SIZE_PX = 512  # Pixel size of the PLACES_ICON_URL image
+STATIONS_ICON_SIZE_PX = 256  # Pixel size of the STATIONS_ICON_URL image
 
 # Path visualization colors (RGB)
 PATH_COLOR_RGB = (41, 181, 232)  # #29B5E8
@@ -31,9 +33,25 @@ TABLE_PLACES = "ITALY_ARCGIS_PLACES"
 TABLE_POINTS = "ITALY_ARCGIS_POINTS"
 TABLE_RAILWAYS = "ITALY_ARCGIS_RAILWAYS"
 
+# Railway geometries are simplified in Snowflake (tolerance in meters) before
+# being sent to the map; the difference is not visible at country-level zoom
+RAILWAY_SIMPLIFY_TOLERANCE_M = 10
+
 # Search settings
 DEFAULT_NEAREST_STATIONS = 5
-MAX_SELECTABLE_PLACES = 8  # Maximum 8 places for brute-force optimal path calculation
+MAX_SELECTABLE_PLACES = 8  # Maximum 8 places for exact (Held-Karp) path calculation
+# Shortest path distances are computed locally with Haversine (<0.5% from
+# ST_DISTANCE); set True to query Snowflake ST_DISTANCE instead
+USE_SNOWFLAKE_PATH_DISTANCE = False
+
+# Number of rows shown in the DataFrame preview expanders
+DATAFRAME_PREVIEW_ROWS = 100
+
+# Data cache settings
+# Snowflake query results are cached across reruns for this many seconds
+DATA_CACHE_TTL_SECONDS = 3600
+# Generated tourism guides are reused for identical model/prompt pairs
+TOURISM_GUIDE_CACHE_TTL_SECONDS = 86400
 
 # Earth radius for distance calculations
 EARTH_RADIUS_KM = 6371.0
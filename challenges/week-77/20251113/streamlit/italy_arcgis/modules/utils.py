@@ -1,10 +1,14 @@
 import logging
 import sys
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Any, Callable, List
 from zoneinfo import ZoneInfo
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from colorama import Fore, Style, init as colorama_init
 from modules.settings import APPLICATION_NAME
@@ -19,6 +23,9 @@ LOG_LEVEL_COLORS = {
     "ERROR": Fore.RED,
     "CRITICAL": Fore.MAGENTA + Style.BRIGHT,
 }
+COLORED_LEVEL_NAMES = {
+    level: f"{color}{level}{Style.RESET_ALL}" for level, color in LOG_LEVEL_COLORS.items()
+}
 
 class ColorFormatter(logging.Formatter):
     def __init__(self, use_color=True, *args, **kwargs):
@@ -26,10 +33,8 @@ class ColorFormatter(logging.Formatter):
         self.use_color = use_color
 
     def format(self, record):
-        levelname = record.levelname
-        if self.use_color and levelname in LOG_LEVEL_COLORS:
-            color = LOG_LEVEL_COLORS[levelname]
-            record.levelname = f"{color}{levelname}{Style.RESET_ALL}"
+        if self.use_color:
+            record.levelname = COLORED_LEVEL_NAMES.get(record.levelname, record.levelname)
         return super().format(record)
 
 
@@ -81,6 +86,53 @@ def create_session():
         return session
 
 
+# Clear functions of st.cache_resource loaders holding query results
+_REFRESHABLE_RESOURCES: List[Callable[[], None]] = []
+
+
+def clear_on_refresh(func):
+    """Register an st.cache_resource function to be cleared by "Refresh data".
+
+    st.cache_data.clear() does not touch resources, so loaders that keep
+    query results in st.cache_resource opt in with this decorator.
+    """
+    _REFRESHABLE_RESOURCES.append(func.clear)
+    return func
+
+
+@st.cache_resource(show_spinner=False)
+def _data_version() -> List[int]:
+    """Hold the data version shared by all sessions (a one-item list)."""
+    return [0]
+
+
+def get_data_version() -> int:
+    """Return a counter that is bumped whenever cached data is refreshed.
+
+    Objects memoized in session state from loaded data (e.g. map decks)
+    include it in their keys so a refresh by any user invalidates them.
+    """
+    return _data_version()[0]
+
+
+def run_concurrently(*calls: Callable[[], Any]) -> List[Any]:
+    """Run independent calls in worker threads and return results in order.
+
+    Snowpark queries spend their time waiting on the warehouse, so running
+    them side by side costs the slowest query instead of the sum. Workers
+    get the current script run context so st.cache_data works inside them.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(call: Callable[[], Any]) -> Any:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return call()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(run, call) for call in calls]
+        return [future.result() for future in futures]
+
+
 def get_current_datetime():
     return datetime.now(ZoneInfo("Asia/Tokyo")).strftime("%Y-%m-%d %H:%M:%S")
 
@@ -112,3 +164,11 @@ def build_sidebar_common_components():
     st.sidebar.page_link("pages/02_shortest_path.py", label="Shortest Path", icon=":material/route:")
     st.sidebar.page_link("pages/03_sightseeing.py", label="Sightseeing Guide", icon=":material/tour:")
     st.sidebar.page_link("pages/04_h3_index_demo.py", label="H3 Index Demo", icon=":material/hive:")
+
+    st.sidebar.markdown("<br>", unsafe_allow_html=True)
+    if st.sidebar.button("Refresh data", icon=":material/refresh:", use_container_width=True):
+        # Drop cached Snowflake query results so this run re-fetches them
+        st.cache_data.clear()
+        for clear_resource in _REFRESHABLE_RESOURCES:
+            clear_resource()
+        _data_version()[0] += 1
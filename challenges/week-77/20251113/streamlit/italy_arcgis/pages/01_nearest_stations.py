@@ -1,4 +1,3 @@
-from math import asin, cos, radians, sin, sqrt
 from typing import Any, Dict, Optional, Tuple
 
 import pandas as pd
@@ -6,7 +5,7 @@ import streamlit as st
 
 from modules.map import build_map_deck, load_places, load_railways, load_stations
 from modules.selection import extract_selected_feature
-from modules.settings import DEFAULT_NEAREST_STATIONS, EARTH_RADIUS_KM, TABLE_POINTS
+from modules.settings import DATAFRAME_PREVIEW_ROWS, DEFAULT_NEAREST_STATIONS, TABLE_POINTS
 from modules.utils import (
     build_main_common_components,
     build_sidebar_common_components,
@@ -32,6 +31,7 @@ _SELECTABLE_LAYER_ORDER = (
 
 NEAREST_STATIONS_STATE_KEY = "nearest_station_results"
 SELECTED_FEATURE_STATE_KEY = "selected_feature"
+FORM_INITIALIZED_STATE_KEY = "selected_feature_form_initialized"
 
 FeatureDict = Dict[str, str]
 NEAREST_STATION_COLUMNS = [
@@ -77,19 +77,22 @@ def build_map_page() -> None:
     st.subheader("DataFrames")
 
     with st.expander("DataFrame - Places", expanded=False):
-        st.dataframe(df_places.head(100), height=360)
+        st.dataframe(df_places.head(DATAFRAME_PREVIEW_ROWS), height=360)
 
     with st.expander("DataFrame - Stations", expanded=False):
-        st.dataframe(df_stations.head(100), height=360)
+        st.dataframe(df_stations.head(DATAFRAME_PREVIEW_ROWS), height=360)
 
     with st.expander("DataFrame - Railways", expanded=False):
-        st.dataframe(df_railways.head(100), height=360)
+        st.dataframe(df_railways.head(DATAFRAME_PREVIEW_ROWS), height=360)
 
 
 def _ensure_form_state() -> None:
-    """Ensure initial values for session state used in forms."""
+    """Ensure initial values for session state used in forms (once per session)."""
+    if st.session_state.get(FORM_INITIALIZED_STATE_KEY):
+        return
     for key in FORM_FIELD_KEYS.values():
         st.session_state.setdefault(key, "")
+    st.session_state[FORM_INITIALIZED_STATE_KEY] = True
 
 
 def _sync_selection_to_form(selection_state: Any) -> None:
@@ -177,8 +180,9 @@ def _compute_nearest_stations_with_snowflake(
 ) -> pd.DataFrame:
     """Use Snowflake geospatial functions to find nearest stations.
 
-    This function calculates distances using both ST_DISTANCE (Snowflake)
-    and Haversine formula for comparison.
+    This function calculates distances using both ST_DISTANCE and
+    HAVERSINE in Snowflake for comparison, so the result needs no
+    client-side post-processing.
 
     Args:
         session: Snowflake session object
@@ -191,46 +195,43 @@ def _compute_nearest_stations_with_snowflake(
         (both ST_DISTANCE and Haversine calculations)
     """
     sql = f"""
+    WITH nearest AS (
+        SELECT
+            name,
+            type,
+            osm_id,
+            ST_X(ST_CENTROID(geography)) AS longitude,
+            ST_Y(ST_CENTROID(geography)) AS latitude,
+            ROUND(ST_DISTANCE(
+                geography,
+                ST_POINT(?, ?)
+            ) / 1000, 3) AS st_distance_km
+        FROM {TABLE_POINTS}
+        WHERE type IN ('station')
+        ORDER BY st_distance_km ASC
+        LIMIT {int(top_n)}
+    )
     SELECT
         name,
         type,
         osm_id,
-        ST_X(ST_CENTROID(geography)) AS longitude,
-        ST_Y(ST_CENTROID(geography)) AS latitude,
-        ROUND(ST_DISTANCE(
-            geography,
-            ST_POINT({lon}, {lat})
-        ) / 1000, 3) AS st_distance_km
-    FROM {TABLE_POINTS}
-    WHERE type IN ('station')
+        longitude,
+        latitude,
+        st_distance_km,
+        ROUND(HAVERSINE(?, ?, latitude, longitude), 3) AS haversine_km,
+        ROUND(st_distance_km - haversine_km, 3) AS diff_km
+    FROM nearest
     ORDER BY st_distance_km ASC
-    LIMIT {top_n}
     """
 
     try:
-        df_result = session.sql(sql).to_pandas()
+        df_result = session.sql(sql, params=[lon, lat, lat, lon]).to_pandas()
 
         if df_result.empty:
             return pd.DataFrame(columns=NEAREST_STATION_COLUMNS)
 
         # Rename columns to match expected format
-        df_result.columns = [col.upper() for col in df_result.columns]
-
-        # Calculate Haversine distance for each station
-        df_result["HAVERSINE_KM"] = df_result.apply(
-            lambda row: _haversine_distance_km(
-                lat, lon, row["LATITUDE"], row["LONGITUDE"]
-            ),
-            axis=1,
-        )
-
-        # Round Haversine distance
-        df_result["HAVERSINE_KM"] = df_result["HAVERSINE_KM"].round(3)
-
-        # Calculate difference between the two methods
-        df_result["DIFF_KM"] = (
-            df_result["ST_DISTANCE_KM"] - df_result["HAVERSINE_KM"]
-        ).round(3)
+        df_result.rename(columns=str.upper, inplace=True)
 
         return df_result
     except Exception as e:
@@ -238,29 +239,6 @@ def _compute_nearest_stations_with_snowflake(
         return pd.DataFrame(columns=NEAREST_STATION_COLUMNS)
 
 
-def _haversine_distance_km(
-    lat1: float, lon1: float, lat2: float, lon2: float
-) -> float:
-    """Calculate distance between two points using Haversine formula.
-
-    Args:
-        lat1: Latitude of first point
-        lon1: Longitude of first point
-        lat2: Latitude of second point
-        lon2: Longitude of second point
-
-    Returns:
-        Distance in kilometers
-    """
-    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-
-    a = sin(dlat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    return EARTH_RADIUS_KM * c
-
-
 if __name__ == "__main__":
     session = create_session()
     st.session_state.session = session
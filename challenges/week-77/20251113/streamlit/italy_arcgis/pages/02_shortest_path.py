@@ -2,22 +2,30 @@
 
 This page allows users to select up to 8 places on the map and
 calculates the optimal shortest path visiting all selected locations.
-Uses brute-force exhaustive search to guarantee the optimal solution.
+Uses Held-Karp dynamic programming to guarantee the optimal solution.
 """
 
-from itertools import permutations
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
+import pydeck
 import streamlit as st
 
 from modules.map import build_map_deck, load_places, load_railways, load_stations
 from modules.selection import extract_selected_feature
-from modules.settings import EARTH_RADIUS_KM, MAX_SELECTABLE_PLACES
+from modules.settings import (
+    DATA_CACHE_TTL_SECONDS,
+    DATAFRAME_PREVIEW_ROWS,
+    EARTH_RADIUS_KM,
+    MAX_SELECTABLE_PLACES,
+    USE_SNOWFLAKE_PATH_DISTANCE,
+)
 from modules.utils import (
     build_main_common_components,
     build_sidebar_common_components,
     create_session,
+    get_data_version,
     get_logger,
 )
 
@@ -25,8 +33,12 @@ logger = get_logger(__name__)
 
 MAX_PLACES = MAX_SELECTABLE_PLACES
 SELECTED_PLACES_KEY = "selected_places_list"
+SELECTED_OSM_IDS_KEY = "selected_places_osm_ids"
 SHORTEST_PATH_KEY = "shortest_path_result"
 LAST_SELECTION_KEY = "last_processed_selection"
+MAP_STATE_KEY = "shortest_path_map"
+MAP_DECK_KEY = "shortest_path_map_deck"
+DISTANCE_MATRIX_KEY = "shortest_path_distance_matrix"
 
 _SELECTABLE_LAYER_ORDER = (
     "places_icon_layer",
@@ -43,51 +55,37 @@ def build_shortest_path_page() -> None:
     # Initialize session state
     if SELECTED_PLACES_KEY not in st.session_state:
         st.session_state[SELECTED_PLACES_KEY] = []
+    if SELECTED_OSM_IDS_KEY not in st.session_state:
+        st.session_state[SELECTED_OSM_IDS_KEY] = {
+            place.get("osm_id") for place in st.session_state[SELECTED_PLACES_KEY]
+        }
     if SHORTEST_PATH_KEY not in st.session_state:
         st.session_state[SHORTEST_PATH_KEY] = None
     if LAST_SELECTION_KEY not in st.session_state:
         st.session_state[LAST_SELECTION_KEY] = None
 
-    # Get selected places from session state
-    selected_places = st.session_state[SELECTED_PLACES_KEY]
-
-    # Build selected places DataFrame
-    df_selected = _build_selected_places_df(selected_places, df_places)
-
-    # Build path lines if shortest path is calculated
-    path_lines = None
-    if st.session_state[SHORTEST_PATH_KEY] is not None:
-        path_lines = _build_path_lines(st.session_state[SHORTEST_PATH_KEY])
-
     # Display map
-    deck = build_map_deck(
-        df_places,
-        df_stations,
-        df_railways,
-        selected_places=df_selected,
-        path_lines=path_lines,
-    )
+    deck = _get_map_deck(df_places, df_stations, df_railways)
 
     st.subheader("Select Places on Map")
     st.info(
         f"Click on places to select them (max {MAX_PLACES} places). "
-        "The optimal shortest path will be calculated using exhaustive search."
+        "The optimal shortest path will be calculated using Held-Karp dynamic programming."
     )
 
     # Create 2:1 layout for map and selected places panel
     col_map, col_panel = st.columns([2, 1])
 
     with col_map:
-        selection_state = st.pydeck_chart(
+        # Selection is applied in a callback before the next run, so the
+        # map and panel are rendered once with the updated places
+        st.pydeck_chart(
             deck,
             selection_mode="single-object",
-            on_select="rerun",
-            key="shortest_path_map",
+            on_select=_on_map_select,
+            key=MAP_STATE_KEY,
         )
 
-        # Handle selection
-        _handle_place_selection(selection_state, df_places)
-
     with col_panel:
         # Display selected places and controls
         _render_selected_places_panel(session)
@@ -98,10 +96,57 @@ def build_shortest_path_page() -> None:
     # Show DataFrames
     st.subheader("DataFrames")
     with st.expander("DataFrame - Places", expanded=False):
-        st.dataframe(df_places.head(100), height=360)
+        st.dataframe(df_places.head(DATAFRAME_PREVIEW_ROWS), height=360)
+
 
+def _get_map_deck(
+    df_places: pd.DataFrame, df_stations: pd.DataFrame, df_railways: pd.DataFrame
+) -> pydeck.Deck:
+    """Return the map deck, rebuilding it only when selection or path changes.
 
-def _handle_place_selection(selection_state: Any, df_places: pd.DataFrame) -> None:
+    The last deck is kept in session state keyed by the selected OSM IDs,
+    the calculated path, the data sizes and the data version, so reruns
+    that change none of them (e.g. opening an expander) reuse it without
+    rebuilding any layer.
+    """
+    selected_places = st.session_state[SELECTED_PLACES_KEY]
+    result = st.session_state[SHORTEST_PATH_KEY]
+    deck_key = (
+        tuple(place.get("osm_id") for place in selected_places),
+        tuple(result["path"]) if result is not None else None,
+        len(df_places),
+        len(df_stations),
+        len(df_railways),
+        get_data_version(),
+    )
+
+    cached = st.session_state.get(MAP_DECK_KEY)
+    if cached is not None and cached[0] == deck_key:
+        return cached[1]
+
+    # Build selected places DataFrame
+    df_selected = _build_selected_places_df(selected_places, df_places)
+
+    # Build path lines if shortest path is calculated
+    path_lines = _build_path_lines(result) if result is not None else None
+
+    deck = build_map_deck(
+        df_places,
+        df_stations,
+        df_railways,
+        selected_places=df_selected,
+        path_lines=path_lines,
+    )
+    st.session_state[MAP_DECK_KEY] = (deck_key, deck)
+    return deck
+
+
+def _on_map_select() -> None:
+    """Callback for map selection events."""
+    _handle_place_selection(st.session_state.get(MAP_STATE_KEY))
+
+
+def _handle_place_selection(selection_state: Any) -> None:
     """Handle place selection from map and update session state."""
     if not selection_state:
         return
@@ -120,7 +165,7 @@ def _handle_place_selection(selection_state: Any, df_places: pd.DataFrame) -> No
     selected_places = st.session_state[SELECTED_PLACES_KEY]
 
     # Check if already selected
-    if any(p.get("osm_id") == osm_id for p in selected_places):
+    if osm_id in st.session_state[SELECTED_OSM_IDS_KEY]:
         # Update last selection even if already in list
         st.session_state[LAST_SELECTION_KEY] = osm_id
         return
@@ -134,14 +179,12 @@ def _handle_place_selection(selection_state: Any, df_places: pd.DataFrame) -> No
     # Add to selected places
     selected_places.append(feature)
     st.session_state[SELECTED_PLACES_KEY] = selected_places
+    st.session_state[SELECTED_OSM_IDS_KEY].add(osm_id)
     st.session_state[LAST_SELECTION_KEY] = osm_id
 
     # Clear shortest path result when selection changes
     st.session_state[SHORTEST_PATH_KEY] = None
 
-    # Rerun to update the map and UI immediately
-    st.rerun()
-
 
 def _build_selected_places_df(
     selected_places: List[Dict[str, str]], df_places: pd.DataFrame
@@ -150,26 +193,27 @@ def _build_selected_places_df(
     if not selected_places:
         return pd.DataFrame(columns=["LONGITUDE", "LATITUDE", "NAME", "OSM_ID"])
 
-    data = []
-    for place in selected_places:
-        try:
-            data.append(
-                {
-                    "LONGITUDE": float(place["longitude"]),
-                    "LATITUDE": float(place["latitude"]),
-                    "NAME": place["name"],
-                    "OSM_ID": place["osm_id"],
-                    "TYPE": place["type"],
-                }
-            )
-        except (ValueError, KeyError) as e:
-            logger.warning(f"Invalid place data: {e}")
-            continue
+    df_selected = pd.DataFrame(
+        {
+            "LONGITUDE": pd.to_numeric(
+                [place.get("longitude") for place in selected_places], errors="coerce"
+            ),
+            "LATITUDE": pd.to_numeric(
+                [place.get("latitude") for place in selected_places], errors="coerce"
+            ),
+            "NAME": [place.get("name") for place in selected_places],
+            "OSM_ID": [place.get("osm_id") for place in selected_places],
+            "TYPE": [place.get("type") for place in selected_places],
+        }
+    )
 
-    if not data:
-        return pd.DataFrame(columns=["LONGITUDE", "LATITUDE", "NAME", "OSM_ID"])
+    # Places with unparsable coordinates are skipped
+    invalid = df_selected["LONGITUDE"].isna() | df_selected["LATITUDE"].isna()
+    if invalid.any():
+        logger.warning(f"Invalid place data skipped: {int(invalid.sum())} place(s)")
+        df_selected = df_selected[~invalid]
 
-    return pd.DataFrame(data)
+    return df_selected
 
 
 def _render_selected_places_panel(session) -> None:
@@ -182,19 +226,30 @@ def _render_selected_places_panel(session) -> None:
         st.info("No places selected. Click on places on the map to select them.")
         return
 
-    # Display selected places
-    for idx, place in enumerate(selected_places):
-        col1, col2, col3 = st.columns([0.5, 3, 1])
-        with col1:
-            st.write(f"{idx + 1}.")
-        with col2:
-            st.write(f"**{place['name']}** ({place['type']})")
-        with col3:
-            if st.button("Remove", key=f"remove_{idx}"):
-                selected_places.pop(idx)
-                st.session_state[SELECTED_PLACES_KEY] = selected_places
-                st.session_state[SHORTEST_PATH_KEY] = None
-                st.rerun()
+    # Display selected places as one editable table with a remove checkbox
+    df_panel = pd.DataFrame(
+        {
+            "#": range(1, len(selected_places) + 1),
+            "Name": [place["name"] for place in selected_places],
+            "Type": [place["type"] for place in selected_places],
+            "Remove": False,
+        }
+    )
+    edited = st.data_editor(
+        df_panel,
+        column_config={"Remove": st.column_config.CheckboxColumn("Remove")},
+        disabled=["#", "Name", "Type"],
+        hide_index=True,
+        use_container_width=True,
+        key="selected_places_editor",
+    )
+    removed = edited["Remove"].to_numpy()
+    if removed.any():
+        kept_places = [place for place, remove in zip(selected_places, removed) if not remove]
+        st.session_state[SELECTED_PLACES_KEY] = kept_places
+        st.session_state[SELECTED_OSM_IDS_KEY] = {place.get("osm_id") for place in kept_places}
+        st.session_state[SHORTEST_PATH_KEY] = None
+        st.rerun()
 
     st.write("---")
 
@@ -202,34 +257,40 @@ def _render_selected_places_panel(session) -> None:
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("Clear All", use_container_width=True):
-            st.session_state[SELECTED_PLACES_KEY] = []
-            st.session_state[SHORTEST_PATH_KEY] = None
-            st.rerun()
+        st.button("Clear All", on_click=_clear_selected_places, use_container_width=True)
 
     with col2:
-        if st.button(
+        st.button(
             "Calculate Shortest Path",
+            on_click=_calculate_shortest_path,
+            args=(session, selected_places),
             disabled=len(selected_places) < 2,
             use_container_width=True,
-        ):
-            _calculate_shortest_path(session, selected_places)
+        )
 
     with col3:
         st.write(f"{len(selected_places)}/{MAX_PLACES} selected")
 
 
+def _clear_selected_places() -> None:
+    """Callback for the Clear All button."""
+    st.session_state[SELECTED_PLACES_KEY] = []
+    st.session_state[SELECTED_OSM_IDS_KEY] = set()
+    st.session_state[SHORTEST_PATH_KEY] = None
+
+
 def _calculate_shortest_path(session, selected_places: List[Dict[str, str]]) -> None:
-    """Calculate the shortest path using brute force optimal algorithm.
+    """Calculate the shortest path using an exact (optimal) algorithm.
 
-    Maximum 8 places are supported to ensure optimal solution is found
-    within reasonable time (7! = 5,040 permutations).
+    Maximum 8 places are supported; Held-Karp needs n^2 * 2^n = 16,384
+    steps at that size. Runs as a button callback, so the following run
+    already draws the path.
     """
     if len(selected_places) < 2:
         st.warning("Please select at least 2 places.")
         return
 
-    # Convert to list of coordinates
+    # Convert to coordinates (a hashable tuple is used as the cache key)
     coords = []
     for place in selected_places:
         try:
@@ -245,11 +306,12 @@ def _calculate_shortest_path(session, selected_places: List[Dict[str, str]]) ->
             st.error("Invalid place data. Please try again.")
             return
 
-    # Calculate distances using Snowflake
-    distances = _calculate_distance_matrix(session, coords)
-
-    # Always use brute force to guarantee optimal solution (max 8 places)
-    best_path, total_distance = _solve_tsp_brute_force(distances)
+    # Places sharing a position are solved as one point; the distance matrix
+    # reuses this session's earlier measurements, so it is built outside
+    # the cached solver and passed in as part of its key
+    members, unique_coords = _group_by_position(tuple(coords))
+    distances = _calculate_distance_matrix(session, unique_coords)
+    best_path, total_distance = _solve_shortest_path(distances, members)
 
     # Store result
     result = {
@@ -259,63 +321,157 @@ def _calculate_shortest_path(session, selected_places: List[Dict[str, str]]) ->
     }
     st.session_state[SHORTEST_PATH_KEY] = result
 
-    # Rerun to update the map with the path visualization
-    st.rerun()
+
+def _group_by_position(
+    coords: Tuple[Tuple[float, float, str], ...]
+) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[float, float, str], ...]]:
+    """Group place indices by position.
+
+    Returns:
+        Tuple of (index groups, one representative coordinate per group)
+    """
+    groups: Dict[Tuple[float, float], List[int]] = {}
+    for idx, (lat, lon, _) in enumerate(coords):
+        groups.setdefault((round(lat, 7), round(lon, 7)), []).append(idx)
+    members = tuple(tuple(group) for group in groups.values())
+    unique_coords = tuple(coords[group[0]] for group in members)
+    return members, unique_coords
+
+
+@st.cache_data(show_spinner=False, ttl=DATA_CACHE_TTL_SECONDS)
+def _solve_shortest_path(
+    distances: np.ndarray, members: Tuple[Tuple[int, ...], ...]
+) -> Tuple[List[int], float]:
+    """Return the optimal visiting order and its distance for the given places.
+
+    Cached on the distance matrix and position groups, so recalculating the
+    same selection skips the solver.
+
+    Args:
+        distances: Distance matrix between the unique positions
+        members: Place indices at each unique position
+
+    Returns:
+        Tuple of (visiting order over all places, total distance in km)
+    """
+    # Held-Karp guarantees the optimal solution (max 8 places)
+    unique_path, total_distance = _solve_tsp_held_karp(distances)
+
+    # Duplicates add zero distance when placed next to their representative
+    best_path = [idx for unique_idx in unique_path for idx in members[unique_idx]]
+    return best_path, total_distance
 
 
 def _calculate_distance_matrix(
-    session, coords: List[Tuple[float, float, str]]
-) -> List[List[float]]:
-    """Calculate distance matrix using Snowflake ST_DISTANCE."""
-    n = len(coords)
-    distances = [[0.0] * n for _ in range(n)]
-
-    for i in range(n):
-        for j in range(i + 1, n):
-            lat1, lon1, _ = coords[i]
-            lat2, lon2, _ = coords[j]
-
-            sql = f"""
-            SELECT ST_DISTANCE(
-                ST_POINT({lon1}, {lat1}),
-                ST_POINT({lon2}, {lat2})
-            ) / 1000 AS distance_km
-            """
-
-            try:
-                result = session.sql(sql).collect()
-                dist = float(result[0]["DISTANCE_KM"])
-                distances[i][j] = dist
-                distances[j][i] = dist
-            except Exception as e:
-                logger.error(f"Error calculating distance: {e}")
-                # Use fallback Haversine formula
-                dist = _haversine_distance(lat1, lon1, lat2, lon2)
-                distances[i][j] = dist
-                distances[j][i] = dist
+    session, coords: Tuple[Tuple[float, float, str], ...]
+) -> np.ndarray:
+    """Calculate distance matrix in km.
 
+    Distances measured for the previous calculation are kept in session
+    state, so adding a place only measures the pairs that involve it and
+    removing a place measures nothing.
+    """
+    n = len(coords)
+    distances = np.zeros((n, n))
+
+    known_rows: List[int] = []
+    previous = st.session_state.get(DISTANCE_MATRIX_KEY)
+    if previous is not None:
+        previous_coords, previous_distances = previous
+        previous_index = {coord: idx for idx, coord in enumerate(previous_coords)}
+        known_rows = [idx for idx, coord in enumerate(coords) if coord in previous_index]
+        source_rows = [previous_index[coords[idx]] for idx in known_rows]
+        distances[np.ix_(known_rows, known_rows)] = previous_distances[
+            np.ix_(source_rows, source_rows)
+        ]
+
+    known = set(known_rows)
+    pairs = [
+        (i, j)
+        for i in range(n)
+        for j in range(i + 1, n)
+        if i not in known or j not in known
+    ]
+    if pairs:
+        rows, cols = (np.array(indices) for indices in zip(*pairs))
+        measured = _measure_pair_distances(session, coords, rows, cols)
+        distances[rows, cols] = measured
+        distances[cols, rows] = measured
+
+    st.session_state[DISTANCE_MATRIX_KEY] = (coords, distances)
     return distances
 
 
-def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate Haversine distance as fallback (in km)."""
-    from math import asin, cos, radians, sin, sqrt
-    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
+def _measure_pair_distances(
+    session,
+    coords: Tuple[Tuple[float, float, str], ...],
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> np.ndarray:
+    """Measure distances (in km) between coords[rows[k]] and coords[cols[k]].
 
-    a = sin(dlat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    return EARTH_RADIUS_KM * c
+    Uses a local vectorized Haversine by default, which avoids Snowflake
+    round-trips. When USE_SNOWFLAKE_PATH_DISTANCE is enabled, all pairs are
+    measured with Snowflake ST_DISTANCE in a single query.
+    """
+    lats = np.array([coord[0] for coord in coords], dtype=np.float64)
+    lons = np.array([coord[1] for coord in coords], dtype=np.float64)
+    if not USE_SNOWFLAKE_PATH_DISTANCE:
+        return _haversine_distances(lats, lons, rows, cols)
+
+    # All pairs in one query: VALUES rows of (k, lon1, lat1, lon2, lat2)
+    values_rows = ", ".join(["(?, ?, ?, ?, ?)"] * len(rows))
+    params: List[Any] = []
+    for k, (i, j) in enumerate(zip(rows.tolist(), cols.tolist())):
+        params.extend([k, lons[i], lats[i], lons[j], lats[j]])
+
+    sql = f"""
+    SELECT
+        k,
+        ST_DISTANCE(ST_POINT(lon1, lat1), ST_POINT(lon2, lat2)) / 1000 AS distance_km
+    FROM (VALUES {values_rows}) AS pairs(k, lon1, lat1, lon2, lat2)
+    """
 
+    try:
+        result = session.sql(sql, params=params).collect()
+    except Exception as e:
+        logger.error(f"Error calculating distances: {e}")
+        # Use fallback Haversine formula
+        return _haversine_distances(lats, lons, rows, cols)
 
-def _solve_tsp_brute_force(
-    distances: List[List[float]],
-) -> Tuple[List[int], float]:
-    """Solve shortest path problem using brute force exhaustive search.
+    measured = np.zeros(len(rows))
+    for row in result:
+        measured[int(row["K"])] = float(row["DISTANCE_KM"])
+    return measured
+
+
+def _haversine_distances(
+    lats: np.ndarray, lons: np.ndarray, rows: np.ndarray, cols: np.ndarray
+) -> np.ndarray:
+    """Calculate Haversine distances (in km) between place pairs (rows[k], cols[k]).
+
+    Radians and cos(latitude) are computed once per place and then indexed
+    per pair, so a place shared by several pairs is not recomputed.
+    """
+    lat_rad = np.radians(lats)
+    lon_rad = np.radians(lons)
+    cos_lat = np.cos(lat_rad)
 
-    This guarantees finding the optimal solution by evaluating all possible
-    paths through all cities. For n places, this evaluates n! permutations.
+    dlat = lat_rad[cols] - lat_rad[rows]
+    dlon = lon_rad[cols] - lon_rad[rows]
+    a = np.sin(dlat / 2) ** 2 + cos_lat[rows] * cos_lat[cols] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _solve_tsp_held_karp(distances: np.ndarray) -> Tuple[List[int], float]:
+    """Solve shortest path problem using Held-Karp dynamic programming.
+
+    dp[mask, j] holds the shortest open path that visits exactly the places
+    in mask and ends at j. Shared sub-paths are computed once, so this finds
+    the optimal solution in O(n^2 * 2^n) instead of evaluating n! paths.
+    Each mask is resolved with one NumPy min over all (previous, end) pairs.
+    The DP tables are compact (float32 costs, int8 parents); the returned
+    distance is re-summed in float64 along the chosen path.
 
     Args:
         distances: n x n distance matrix
@@ -327,46 +483,52 @@ def _solve_tsp_brute_force(
     if n <= 1:
         return [0], 0.0
     if n == 2:
-        return [0, 1], distances[0][1]
+        return [0, 1], float(distances[0, 1])
 
-    all_cities = list(range(n))
-    best_path = None
-    best_distance = float("inf")
+    full_mask = (1 << n) - 1
+    bits = 1 << np.arange(n)
+    dp = np.full((full_mask + 1, n), np.inf, dtype=np.float32)
+    parent = np.full((full_mask + 1, n), -1, dtype=np.int8)
+    distances_f32 = distances.astype(np.float32)
 
-    # Try all permutations of all cities to find truly optimal path
-    for perm in permutations(all_cities):
-        path = list(perm)
-        # Calculate total distance for this path (no return to start)
-        dist = sum(distances[path[i]][path[i + 1]] for i in range(len(path) - 1))
-
-        if dist < best_distance:
-            best_distance = dist
-            best_path = path
+    # Open path: any place can be the start
+    dp[bits, np.arange(n)] = 0.0
 
+    # Every predecessor mask is smaller than mask, so ascending order is safe
+    for mask in range(3, full_mask + 1):
+        ends = np.flatnonzero(mask & bits)
+        if len(ends) < 2:
+            continue
+        # candidates[k, i]: path over mask without ends[k], ending at i, then i -> ends[k]
+        candidates = dp[mask ^ bits[ends]] + distances_f32[:, ends].T
+        best_previous = candidates.argmin(axis=1)
+        dp[mask, ends] = candidates[np.arange(len(ends)), best_previous]
+        parent[mask, ends] = best_previous
+
+    last = int(dp[full_mask].argmin())
+
+    # Walk parents back from the best end point
+    best_path = []
+    mask = full_mask
+    while last != -1:
+        best_path.append(last)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    best_path.reverse()
+
+    best_distance = float(distances[best_path[:-1], best_path[1:]].sum())
     return best_path, best_distance
 
 
-def _build_path_lines(result: Dict[str, Any]) -> List[Dict[str, List[float]]]:
-    """Build path lines data for visualization."""
-    path = result["path"]
+def _build_path_lines(result: Dict[str, Any]) -> List[Dict[str, List[List[float]]]]:
+    """Build path data (one polyline in visiting order) for visualization."""
     places = result["places"]
 
-    lines = []
-    for i in range(len(path) - 1):
-        start_idx = path[i]
-        end_idx = path[i + 1]
-
-        start_place = places[start_idx]
-        end_place = places[end_idx]
-
-        lines.append(
-            {
-                "start": [float(start_place["longitude"]), float(start_place["latitude"])],
-                "end": [float(end_place["longitude"]), float(end_place["latitude"])],
-            }
-        )
-
-    return lines
+    coords = np.array(
+        [[float(place["longitude"]), float(place["latitude"])] for place in places]
+    )
+    return [{"path": coords[result["path"]].tolist()}]
 
 
 def _render_shortest_path_results() -> None:
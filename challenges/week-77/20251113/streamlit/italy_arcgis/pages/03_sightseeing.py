@@ -4,12 +4,22 @@ This page allows users to select a place (by OSM_ID or name) and
 generates a tourism guide using Snowflake's COMPLETE function with AI.
 """
 
-from typing import Any, Dict
+import time
+from collections import OrderedDict
+from string import Template
+from typing import Any, Dict, Optional, Tuple
 
 import pandas as pd
+import pydeck
 import streamlit as st
 
-from modules.map import build_map_deck, load_places, load_railways, load_stations
+try:
+    from snowflake.cortex import Complete
+except ImportError:
+    # snowflake-ml-python is optional; without it guides are fetched in one piece
+    Complete = None
+
+from modules.map import build_map_deck, load_map_data
 from modules.selection import extract_selected_feature
 from modules.settings import (
     AVAILABLE_AI_MODELS,
@@ -18,11 +28,14 @@ from modules.settings import (
     DEFAULT_TOURISM_GUIDE_LANGUAGE,
     LANGUAGE_LENGTH_CONSTRAINTS,
     TABLE_PLACES,
+    TOURISM_GUIDE_CACHE_TTL_SECONDS,
 )
 from modules.utils import (
     build_main_common_components,
     build_sidebar_common_components,
+    clear_on_refresh,
     create_session,
+    get_data_version,
     get_logger,
 )
 
@@ -34,6 +47,7 @@ TOURISM_GUIDE_KEY = "sightseeing_tourism_guide"
 SEARCH_RESULTS_KEY = "sightseeing_search_results"
 LANGUAGE_KEY = "sightseeing_guide_language"
 AI_MODEL_KEY = "sightseeing_ai_model"
+MAP_DECK_KEY = "sightseeing_map_deck"
 
 # Form field keys
 FORM_FIELD_KEYS = {
@@ -46,6 +60,109 @@ FORM_FIELD_KEYS = {
 
 _SELECTABLE_LAYER_ORDER = ("places_icon_layer",)
 
+# Selectbox options and their positions, built once at import
+_LANGUAGE_OPTIONS = list(AVAILABLE_LANGUAGES)
+_LANGUAGE_INDEX = {language: idx for idx, language in enumerate(_LANGUAGE_OPTIONS)}
+_MODEL_OPTIONS = list(AVAILABLE_AI_MODELS)
+_MODEL_INDEX = {model: idx for idx, model in enumerate(_MODEL_OPTIONS)}
+_MODEL_ID_TO_DISPLAY = {model_id: display for display, model_id in AVAILABLE_AI_MODELS.items()}
+
+# Tourism guide prompt; only the four fields are filled in per request
+_TOURISM_GUIDE_PROMPT_TEMPLATE = Template("""Write a comprehensive tourism guide for $place_name, a $place_type in Italy.
+
+IMPORTANT:
+- Write the entire guide in $language_name
+- Format the output in Markdown for better readability
+- Use proper Markdown formatting: headers (##, ###), bold (**text**), lists (- item), etc.
+
+Include the following sections with Markdown headers:
+
+### Overview
+Brief introduction and historical significance
+
+### Main Attractions
+Top sights and landmarks to visit (use bullet points with - )
+
+### Cultural Highlights
+Museums, galleries, and cultural venues (use bullet points with - )
+
+### Local Cuisine
+Famous dishes and recommended restaurants (use bullet points with - )
+
+### Best Time to Visit
+Seasonal recommendations
+
+### Travel Tips
+Practical advice for tourists (use bullet points with - )
+
+Keep the tone informative and engaging. $length_constraint
+Remember: The entire response must be written in $language_name and properly formatted in Markdown.""")
+
+# Generated guides kept for reuse across sessions (see _tourism_guide_cache)
+_TOURISM_GUIDE_CACHE_MAX_ENTRIES = 256
+
+_SQL_CORTEX_COMPLETE = "SELECT SNOWFLAKE.CORTEX.COMPLETE(?, ?) AS tourism_guide"
+
+# Old language keys (without flags) mapped to the current ones (with flags)
+_LEGACY_LANGUAGE_MAP = {
+    "日本語": "🇯🇵 日本語",
+    "English": "🇺🇸 English",
+    "Italiano": "🇮🇹 Italiano",
+}
+
+# Search queries use bind parameters, so the text is built once and the
+# compiled plan can be reused across searches.
+# Name search: LOWER(name) is evaluated once per row; every bind is the
+# lower-cased search text (substring filter, exact match, prefix match)
+_SQL_SEARCH_BY_NAME = f"""
+WITH matches AS (
+    SELECT
+        osm_id,
+        name,
+        type,
+        geography,
+        LOWER(name) AS lower_name
+    FROM {TABLE_PLACES}
+    WHERE lower_name LIKE '%' || ? || '%'
+),
+ranked AS (
+    SELECT
+        osm_id,
+        name,
+        type,
+        geography,
+        CASE
+            WHEN lower_name = ? THEN 1
+            WHEN lower_name LIKE ? || '%' THEN 2
+            ELSE 3
+        END AS match_priority
+    FROM matches
+    ORDER BY match_priority, name
+    LIMIT 10
+)
+SELECT
+    osm_id,
+    name,
+    type,
+    ST_X(ST_CENTROID(geography)) AS longitude,
+    ST_Y(ST_CENTROID(geography)) AS latitude,
+    match_priority
+FROM ranked
+ORDER BY match_priority, name
+"""
+
+_SQL_SEARCH_BY_OSM_ID = f"""
+SELECT
+    osm_id,
+    name,
+    type,
+    ST_X(ST_CENTROID(geography)) AS longitude,
+    ST_Y(ST_CENTROID(geography)) AS latitude
+FROM {TABLE_PLACES}
+WHERE osm_id = ?
+LIMIT 1
+"""
+
 
 def build_sightseeing_page() -> None:
     """Build the sightseeing guide page with map and place selection."""
@@ -53,9 +170,7 @@ def build_sightseeing_page() -> None:
 
     # Load data
     with st.spinner("Loading data..."):
-        df_places = load_places(session)
-        df_stations = load_stations(session)
-        df_railways = load_railways(session)
+        df_places, df_stations, df_railways = load_map_data(session)
 
     # Initialize session state
     _ensure_form_state()
@@ -64,7 +179,7 @@ def build_sightseeing_page() -> None:
     st.subheader("Select a Place")
     st.info("Click on a place on the map or search by name/OSM_ID below")
 
-    deck = build_map_deck(df_places, df_stations, df_railways)
+    deck = _get_map_deck(df_places, df_stations, df_railways)
     selection_state = st.pydeck_chart(
         deck,
         selection_mode="single-object",
@@ -82,6 +197,26 @@ def build_sightseeing_page() -> None:
     _render_tourism_guide()
 
 
+def _get_map_deck(
+    df_places: pd.DataFrame, df_stations: pd.DataFrame, df_railways: pd.DataFrame
+) -> pydeck.Deck:
+    """Return the map deck, rebuilding it only when the loaded data changes.
+
+    The deck has no per-selection layers, so the last one is kept in session
+    state keyed by the data sizes and data version and reused on map clicks
+    and form reruns.
+    """
+    deck_key = (len(df_places), len(df_stations), len(df_railways), get_data_version())
+
+    cached = st.session_state.get(MAP_DECK_KEY)
+    if cached is not None and cached[0] == deck_key:
+        return cached[1]
+
+    deck = build_map_deck(df_places, df_stations, df_railways)
+    st.session_state[MAP_DECK_KEY] = (deck_key, deck)
+    return deck
+
+
 def _ensure_form_state() -> None:
     """Ensure initial values for session state used in forms."""
     for key in FORM_FIELD_KEYS.values():
@@ -95,34 +230,26 @@ def _ensure_form_state() -> None:
         st.session_state[LANGUAGE_KEY] = DEFAULT_TOURISM_GUIDE_LANGUAGE
     elif st.session_state[LANGUAGE_KEY] not in AVAILABLE_LANGUAGES:
         # Migrate old language keys to new ones with flags
-        language_mapping = {
-            "日本語": "🇯🇵 日本語",
-            "English": "🇺🇸 English",
-            "Italiano": "🇮🇹 Italiano",
-        }
         old_value = st.session_state[LANGUAGE_KEY]
-        st.session_state[LANGUAGE_KEY] = language_mapping.get(old_value, DEFAULT_TOURISM_GUIDE_LANGUAGE)
+        st.session_state[LANGUAGE_KEY] = _LEGACY_LANGUAGE_MAP.get(
+            old_value, DEFAULT_TOURISM_GUIDE_LANGUAGE
+        )
 
     # Initialize AI model selection
     if AI_MODEL_KEY not in st.session_state:
         # Find the default model's display name
-        default_display_name = None
-        for display_name, model_id in AVAILABLE_AI_MODELS.items():
-            if model_id == DEFAULT_CORTEX_LLM_MODEL:
-                default_display_name = display_name
-                break
-        st.session_state[AI_MODEL_KEY] = default_display_name or "Claude 3.5 Sonnet"
+        st.session_state[AI_MODEL_KEY] = _MODEL_ID_TO_DISPLAY.get(
+            DEFAULT_CORTEX_LLM_MODEL, "Claude 3.5 Sonnet"
+        )
 
 
 def _sync_selection_to_form(selection_state: Any) -> None:
     """Sync selected place from map to session state and form fields."""
     feature = extract_selected_feature(selection_state, _SELECTABLE_LAYER_ORDER)
-    if not feature:
+    if not feature or feature == st.session_state.get(SELECTED_PLACE_KEY):
         return
 
-    st.session_state[SELECTED_PLACE_KEY] = feature
-    for field, key in FORM_FIELD_KEYS.items():
-        st.session_state[key] = feature.get(field, "")
+    _select_place(feature)
 
 
 def _render_place_selection_form(session, df_places: pd.DataFrame) -> None:
@@ -205,22 +332,16 @@ def _render_place_selection_form(session, df_places: pd.DataFrame) -> None:
             # Handle migration from old language keys (without flags) to new ones (with flags)
             if current_language not in AVAILABLE_LANGUAGES:
                 # Try to find matching language without flag
-                language_mapping = {
-                    "日本語": "🇯🇵 日本語",
-                    "English": "🇺🇸 English",
-                    "Italiano": "🇮🇹 Italiano",
-                }
-                current_language = language_mapping.get(current_language, DEFAULT_TOURISM_GUIDE_LANGUAGE)
-
-            # Calculate the index for the selectbox
-            try:
-                default_index = list(AVAILABLE_LANGUAGES.keys()).index(current_language)
-            except ValueError:
-                default_index = 0  # Fallback to first option if not found
+                current_language = _LEGACY_LANGUAGE_MAP.get(
+                    current_language, DEFAULT_TOURISM_GUIDE_LANGUAGE
+                )
+
+            # Calculate the index for the selectbox (first option if not found)
+            default_index = _LANGUAGE_INDEX.get(current_language, 0)
 
             language = st.selectbox(
                 "Guide Language / ガイド言語",
-                options=list(AVAILABLE_LANGUAGES.keys()),
+                options=_LANGUAGE_OPTIONS,
                 index=default_index,
                 key=LANGUAGE_KEY,
             )
@@ -229,15 +350,12 @@ def _render_place_selection_form(session, df_places: pd.DataFrame) -> None:
             # AI Model selection
             current_model_display = st.session_state.get(AI_MODEL_KEY, "Claude 3.5 Sonnet")
 
-            # Calculate the index for the model selectbox
-            try:
-                model_index = list(AVAILABLE_AI_MODELS.keys()).index(current_model_display)
-            except ValueError:
-                model_index = 0  # Fallback to first option if not found
+            # Calculate the index for the model selectbox (first option if not found)
+            model_index = _MODEL_INDEX.get(current_model_display, 0)
 
             ai_model_display = st.selectbox(
                 "AI Model",
-                options=list(AVAILABLE_AI_MODELS.keys()),
+                options=_MODEL_OPTIONS,
                 index=model_index,
                 key=AI_MODEL_KEY,
             )
@@ -263,70 +381,30 @@ def _render_search_results() -> None:
 
     st.info(f"Found {len(results)} places. Please select one:")
 
-    # Display header
-    col1, col2, col3, col4 = st.columns([3, 1.5, 1.5, 1])
-    with col1:
-        st.write("**Name**")
-    with col2:
-        st.write("**Type**")
-    with col3:
-        st.write("**OSM ID**")
-    with col4:
-        st.write("")
-
-    st.markdown("---")
+    # One table with row selection instead of a button per result
+    event = st.dataframe(
+        results[["NAME", "TYPE", "OSM_ID"]],
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="search_results_table",
+    )
+    selected_rows = event.selection.rows
+    if not selected_rows:
+        return
 
-    # Display search results for user to select
-    for idx, row in results.iterrows():
-        col1, col2, col3, col4 = st.columns([3, 1.5, 1.5, 1])
-        with col1:
-            st.write(f"{row['NAME']}")
-        with col2:
-            st.write(f"_{row['TYPE']}_")
-        with col3:
-            st.write(f"`{row['OSM_ID']}`")
-        with col4:
-            if st.button("Select", key=f"select_result_{idx}"):
-                place = {
-                    "osm_id": str(row["OSM_ID"]),
-                    "name": str(row["NAME"]),
-                    "type": str(row["TYPE"]),
-                    "longitude": f"{float(row['LONGITUDE']):.6f}",
-                    "latitude": f"{float(row['LATITUDE']):.6f}",
-                }
-                st.session_state[SELECTED_PLACE_KEY] = place
-                for field, key in FORM_FIELD_KEYS.items():
-                    st.session_state[key] = place.get(field, "")
-                st.session_state[SEARCH_RESULTS_KEY] = None
-                st.rerun()
+    _select_place(_to_place(results.iloc[selected_rows[0]].to_dict()))
+    st.session_state[SEARCH_RESULTS_KEY] = None
+    st.rerun()
 
 
 def _search_place_by_name(session, name: str) -> None:
     """Search for a place by name and update session state."""
     try:
-        # Escape single quotes in the name for SQL safety
-        safe_name = name.replace("'", "''")
-
-        sql = f"""
-        SELECT
-            osm_id,
-            name,
-            type,
-            ST_X(ST_CENTROID(geography)) AS longitude,
-            ST_Y(ST_CENTROID(geography)) AS latitude,
-            CASE
-                WHEN LOWER(name) = LOWER('{safe_name}') THEN 1
-                WHEN LOWER(name) LIKE LOWER('{safe_name}%') THEN 2
-                WHEN LOWER(name) LIKE LOWER('%{safe_name}%') THEN 3
-                ELSE 4
-            END AS match_priority
-        FROM {TABLE_PLACES}
-        WHERE LOWER(name) LIKE LOWER('%{safe_name}%')
-        ORDER BY match_priority, name
-        LIMIT 10
-        """
-
-        result = session.sql(sql).to_pandas()
+        lower_name = name.lower()
+        params = [lower_name, lower_name, lower_name]
+        result = session.sql(_SQL_SEARCH_BY_NAME, params=params).to_pandas()
 
         if result.empty:
             st.session_state[SEARCH_RESULTS_KEY] = None
@@ -334,22 +412,12 @@ def _search_place_by_name(session, name: str) -> None:
             return
 
         # Store search results in session state
-        result.columns = [col.upper() for col in result.columns]
         st.session_state[SEARCH_RESULTS_KEY] = result
 
         # If single result, auto-select
         if len(result) == 1:
-            place = {
-                "osm_id": str(result["OSM_ID"].iloc[0]),
-                "name": str(result["NAME"].iloc[0]),
-                "type": str(result["TYPE"].iloc[0]),
-                "longitude": f"{float(result['LONGITUDE'].iloc[0]):.6f}",
-                "latitude": f"{float(result['LATITUDE'].iloc[0]):.6f}",
-            }
-
-            st.session_state[SELECTED_PLACE_KEY] = place
-            for field, key in FORM_FIELD_KEYS.items():
-                st.session_state[key] = place.get(field, "")
+            place = _to_place(result.iloc[0].to_dict())
+            _select_place(place)
 
             st.success(f"Found: {place['name']} ({place['type']})")
             st.rerun()
@@ -362,37 +430,16 @@ def _search_place_by_name(session, name: str) -> None:
 def _search_place_by_osm_id(session, osm_id: str) -> None:
     """Search for a place by OSM ID and update session state."""
     try:
-        sql = f"""
-        SELECT
-            osm_id,
-            name,
-            type,
-            ST_X(ST_CENTROID(geography)) AS longitude,
-            ST_Y(ST_CENTROID(geography)) AS latitude
-        FROM {TABLE_PLACES}
-        WHERE osm_id = '{osm_id}'
-        LIMIT 1
-        """
-
-        result = session.sql(sql).to_pandas()
+        # At most one row, so read it directly instead of building a DataFrame
+        rows = session.sql(_SQL_SEARCH_BY_OSM_ID, params=[osm_id]).collect()
 
-        if result.empty:
+        if not rows:
             st.warning(f"No place found with OSM ID '{osm_id}'")
             return
 
         # Update session state with found place
-        result.columns = [col.upper() for col in result.columns]
-        place = {
-            "osm_id": str(result["OSM_ID"].iloc[0]),
-            "name": str(result["NAME"].iloc[0]),
-            "type": str(result["TYPE"].iloc[0]),
-            "longitude": f"{float(result['LONGITUDE'].iloc[0]):.6f}",
-            "latitude": f"{float(result['LATITUDE'].iloc[0]):.6f}",
-        }
-
-        st.session_state[SELECTED_PLACE_KEY] = place
-        for field, key in FORM_FIELD_KEYS.items():
-            st.session_state[key] = place.get(field, "")
+        place = _to_place(rows[0].asDict())
+        _select_place(place)
 
         st.success(f"Found: {place['name']} ({place['type']})")
         st.rerun()
@@ -402,7 +449,30 @@ def _search_place_by_osm_id(session, osm_id: str) -> None:
         st.error(f"Error searching for place: {e}")
 
 
-def _generate_tourism_guide(session, place: Dict[str, str], language: str, model_id: str) -> None:
+def _to_place(record: Dict[str, Any]) -> Dict[str, str]:
+    """Build the selected place dict from one search result record."""
+    return {
+        "osm_id": str(record["OSM_ID"]),
+        "name": str(record["NAME"]),
+        "type": str(record["TYPE"]),
+        "longitude": f"{float(record['LONGITUDE']):.6f}",
+        "latitude": f"{float(record['LATITUDE']):.6f}",
+    }
+
+
+def _select_place(place: Dict[str, str]) -> None:
+    """Store place as the selected place and fill the form fields from it."""
+    st.session_state[SELECTED_PLACE_KEY] = place
+    st.session_state.update({key: place.get(field, "") for field, key in FORM_FIELD_KEYS.items()})
+
+
+def _generate_tourism_guide(
+    session,
+    place: Dict[str, str],
+    language: str,
+    model_id: str,
+    regenerate: bool = False,
+) -> None:
     """Generate tourism guide using Snowflake COMPLETE function.
 
     Args:
@@ -410,6 +480,7 @@ def _generate_tourism_guide(session, place: Dict[str, str], language: str, model
         place: Dictionary containing place information
         language: Target language for the guide (e.g., "🇯🇵 日本語", "🇺🇸 English")
         model_id: Snowflake Cortex model ID (e.g., "claude-3-5-sonnet")
+        regenerate: Discard a cached guide for the same inputs and call Cortex again
     """
     place_name = place.get("name", "Unknown")
     place_type = place.get("type", "place")
@@ -428,82 +499,102 @@ def _generate_tourism_guide(session, place: Dict[str, str], language: str, model
     )
     length_constraint = length_config["prompt_text"]
 
-    with st.spinner(f"Generating tourism guide for {place_name}..."):
-        try:
-            # Create a prompt for the AI with language specification
-            prompt = f"""Write a comprehensive tourism guide for {place_name}, a {place_type} in Italy.
+    try:
+        # Create a prompt for the AI with language specification
+        prompt = _TOURISM_GUIDE_PROMPT_TEMPLATE.substitute(
+            place_name=place_name,
+            place_type=place_type,
+            language_name=language_name,
+            length_constraint=length_constraint,
+        )
+
+        if regenerate:
+            _tourism_guide_cache().pop((model_id, prompt), None)
+        guide = _get_cached_tourism_guide(model_id, prompt)
+
+        if guide is None:
+            if Complete is not None:
+                # Show the guide as it is generated instead of after the full response
+                response_iter = Complete(model_id, prompt, session=session, stream=True)
+                guide = st.write_stream(response_iter)
+            else:
+                with st.spinner(f"Generating tourism guide for {place_name}..."):
+                    guide = _run_cortex_complete(session, model_id, prompt)
+            if guide:
+                _store_tourism_guide(model_id, prompt, guide)
+
+        if guide:
+            # Get model display name for showing to user
+            model_display_name = _MODEL_ID_TO_DISPLAY.get(model_id)
+
+            st.session_state[TOURISM_GUIDE_KEY] = {
+                "place": place,
+                "guide": guide,
+                "language": language,
+                "model": model_id,
+                "model_display": model_display_name or model_id,
+            }
+            st.success(f"Tourism guide generated for {place_name}!")
+            st.rerun()
+        else:
+            st.error("Failed to generate tourism guide. Please try again.")
 
-IMPORTANT:
-- Write the entire guide in {language_name}
-- Format the output in Markdown for better readability
-- Use proper Markdown formatting: headers (##, ###), bold (**text**), lists (- item), etc.
+    except Exception as e:
+        logger.error(f"Error generating tourism guide: {e}")
+        st.error(f"Error generating tourism guide: {e}")
+
+        # Fallback: provide a simple message
+        if "COMPLETE" in str(e).upper() or "CORTEX" in str(e).upper():
+            st.warning(
+                "Snowflake Cortex AI functions may not be available in your account. "
+                "Please check that CORTEX is enabled."
+            )
 
-Include the following sections with Markdown headers:
 
-### Overview
-Brief introduction and historical significance
+@clear_on_refresh
+@st.cache_resource(show_spinner=False)
+def _tourism_guide_cache() -> "OrderedDict[Tuple[str, str], Tuple[float, str]]":
+    """Return generated guides shared by all sessions, oldest first.
 
-### Main Attractions
-Top sights and landmarks to visit (use bullet points with - )
+    Keyed on (model_id, prompt); each entry holds (stored_at, guide).
+    """
+    return OrderedDict()
 
-### Cultural Highlights
-Museums, galleries, and cultural venues (use bullet points with - )
 
-### Local Cuisine
-Famous dishes and recommended restaurants (use bullet points with - )
+def _get_cached_tourism_guide(model_id: str, prompt: str) -> Optional[str]:
+    """Return the cached guide for (model_id, prompt), or None if missing or expired."""
+    entry = _tourism_guide_cache().get((model_id, prompt))
+    if entry is None or time.monotonic() - entry[0] > TOURISM_GUIDE_CACHE_TTL_SECONDS:
+        return None
+    return entry[1]
 
-### Best Time to Visit
-Seasonal recommendations
 
-### Travel Tips
-Practical advice for tourists (use bullet points with - )
+def _store_tourism_guide(model_id: str, prompt: str, guide: str) -> None:
+    """Cache a generated guide, evicting the oldest beyond the size limit."""
+    cache = _tourism_guide_cache()
+    key = (model_id, prompt)
+    cache.pop(key, None)
+    cache[key] = (time.monotonic(), guide)
+    while len(cache) > _TOURISM_GUIDE_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
 
-Keep the tone informative and engaging. {length_constraint}
-Remember: The entire response must be written in {language_name} and properly formatted in Markdown."""
-
-            # Use Snowflake COMPLETE function
-            # Note: COMPLETE is typically available in Snowflake Cortex
-            # Model is selected by user via UI
-            sql = f"""
-            SELECT SNOWFLAKE.CORTEX.COMPLETE(
-                '{model_id}',
-                '{prompt.replace("'", "''")}'
-            ) AS tourism_guide
-            """
-
-            result = session.sql(sql).to_pandas()
-
-            if not result.empty and result["TOURISM_GUIDE"].iloc[0]:
-                guide = result["TOURISM_GUIDE"].iloc[0]
-                # Get model display name for showing to user
-                model_display_name = None
-                for display_name, model in AVAILABLE_AI_MODELS.items():
-                    if model == model_id:
-                        model_display_name = display_name
-                        break
-
-                st.session_state[TOURISM_GUIDE_KEY] = {
-                    "place": place,
-                    "guide": guide,
-                    "language": language,
-                    "model": model_id,
-                    "model_display": model_display_name or model_id,
-                }
-                st.success(f"Tourism guide generated for {place_name}!")
-                st.rerun()
-            else:
-                st.error("Failed to generate tourism guide. Please try again.")
 
-        except Exception as e:
-            logger.error(f"Error generating tourism guide: {e}")
-            st.error(f"Error generating tourism guide: {e}")
+def _run_cortex_complete(session, model_id: str, prompt: str) -> Optional[str]:
+    """Run Snowflake Cortex COMPLETE in one query.
 
-            # Fallback: provide a simple message
-            if "COMPLETE" in str(e).upper() or "CORTEX" in str(e).upper():
-                st.warning(
-                    "Snowflake Cortex AI functions may not be available in your account. "
-                    "Please check that CORTEX is enabled."
-                )
+    Args:
+        session: Snowflake session object
+        model_id: Snowflake Cortex model ID (selected by user via UI)
+        prompt: Full prompt text
+
+    Returns:
+        Generated text, or None if COMPLETE returned nothing
+    """
+    # Note: COMPLETE is typically available in Snowflake Cortex
+    rows = session.sql(_SQL_CORTEX_COMPLETE, params=[model_id, prompt]).collect()
+    if not rows:
+        return None
+    return rows[0]["TOURISM_GUIDE"]
 
 
 def _render_tourism_guide() -> None:
@@ -544,7 +635,9 @@ def _render_tourism_guide() -> None:
             current_language = st.session_state.get(LANGUAGE_KEY, DEFAULT_TOURISM_GUIDE_LANGUAGE)
             current_model_display = st.session_state.get(AI_MODEL_KEY, "Claude 3.5 Sonnet")
             current_model_id = AVAILABLE_AI_MODELS.get(current_model_display, DEFAULT_CORTEX_LLM_MODEL)
-            _generate_tourism_guide(session, place, current_language, current_model_id)
+            _generate_tourism_guide(
+                session, place, current_language, current_model_id, regenerate=True
+            )
 
     with col2:
         if st.button("🗑️ Clear Guide", use_container_width=True):
@@ -7,8 +7,11 @@ through three interactive analysis types:
 3. Station Coverage - Calculate railway station coverage
 """
 
+from functools import partial
+from typing import Callable, Tuple
+
+import pydeck
 import streamlit as st
-from snowflake.snowpark.context import get_active_session
 
 from modules.h3_map import (
     build_h3_coverage_deck,
@@ -41,7 +44,9 @@ from modules.utils import (
     build_main_common_components,
     build_sidebar_common_components,
     create_session,
+    get_data_version,
     get_logger,
+    run_concurrently,
 )
 
 logger = get_logger(__name__)
@@ -53,6 +58,20 @@ COVERAGE_RADIUS_KEY = "h3_coverage_radius"
 DENSITY_LOW_THRESHOLD_KEY = "h3_density_low_threshold"
 DENSITY_HIGH_THRESHOLD_KEY = "h3_density_high_threshold"
 SHOW_CITY_ICONS_KEY = "h3_show_city_icons"
+MAP_DECK_KEY = "h3_map_deck"
+
+# Resolution descriptions
+_RESOLUTION_INFO = {
+    3: "広域（州レベル）- 地域密度分析に適しています",
+    4: "広域（州レベル）- 地域密度分析に適しています",
+    5: "広域（州レベル）- 地域密度分析に適しています",
+    6: "中域（市レベル）- 都市計画に適しています",
+    7: "中域（市レベル）- 都市計画に適しています",
+    8: "狭域（地区レベル）- 店舗カバレッジ分析に適しています",
+}
+
+# Debug output is only rendered when the page is opened with ?debug=1
+DEBUG = st.query_params.get("debug") == "1"
 
 
 def _ensure_session_state() -> None:
@@ -148,6 +167,16 @@ def _render_controls() -> tuple[str, int, float, float, float, bool]:
     """
     st.subheader("⚙️ Analysis Settings")
 
+    # Widget values are committed to session state before the script reruns,
+    # so every setting is read once here and reused below
+    state = st.session_state
+    analysis_type = state[ANALYSIS_TYPE_KEY]
+    resolution = state[RESOLUTION_KEY]
+    coverage_radius = state.get(COVERAGE_RADIUS_KEY, DEFAULT_COVERAGE_RADIUS_KM)
+    low_threshold = state.get(DENSITY_LOW_THRESHOLD_KEY, DEFAULT_DENSITY_LOW_THRESHOLD)
+    high_threshold = state.get(DENSITY_HIGH_THRESHOLD_KEY, DEFAULT_DENSITY_HIGH_THRESHOLD)
+    show_city_icons = state.get(SHOW_CITY_ICONS_KEY, DEFAULT_SHOW_CITY_ICONS)
+
     # Analysis Type
     st.selectbox(
         "Analysis Type",
@@ -163,7 +192,7 @@ def _render_controls() -> tuple[str, int, float, float, float, bool]:
         "H3 Resolution",
         min_value=MIN_H3_RESOLUTION,
         max_value=MAX_H3_RESOLUTION,
-        value=st.session_state[RESOLUTION_KEY],
+        value=resolution,
         step=1,
         help="Higher resolution = smaller hexagons = more detail",
         key=RESOLUTION_KEY,
@@ -171,76 +200,77 @@ def _render_controls() -> tuple[str, int, float, float, float, bool]:
 
     st.divider()
 
-    # Get current values from session state
-    analysis_type = st.session_state[ANALYSIS_TYPE_KEY]
-
     # Analysis-specific settings
-    if H3_ANALYSIS_TYPES[analysis_type] == "coverage":
-        # Coverage radius for Station Coverage
-        st.slider(
-            "Coverage Radius (km)",
-            min_value=MIN_COVERAGE_RADIUS_KM,
-            max_value=MAX_COVERAGE_RADIUS_KM,
-            value=st.session_state[COVERAGE_RADIUS_KEY],
-            step=0.5,
-            help="Radius around each station considered as covered",
-            key=COVERAGE_RADIUS_KEY,
-        )
-
-    elif H3_ANALYSIS_TYPES[analysis_type] == "density":
-        # City icons checkbox for City Density Heatmap
-        # Debug: Show state BEFORE checkbox
-        st.caption(f"🔍 Before checkbox - Session state: {st.session_state.get(SHOW_CITY_ICONS_KEY, 'NOT SET')}, Default: {DEFAULT_SHOW_CITY_ICONS}")
-
-        st.checkbox(
-            "Show City Icons",
-            help="Display city location markers on the map",
-            key=SHOW_CITY_ICONS_KEY,
-        )
-
-        # Debug: Show the value immediately after checkbox
-        current_value = st.session_state.get(SHOW_CITY_ICONS_KEY, DEFAULT_SHOW_CITY_ICONS)
-        st.caption(f"⚙️ After checkbox - Current value: {current_value}")
-
-        st.markdown("**Density Thresholds**")
-        st.caption("Percentage of maximum city count")
-
-        st.slider(
-            "Low Threshold (%)",
-            min_value=MIN_DENSITY_THRESHOLD,
-            max_value=MAX_DENSITY_THRESHOLD,
-            value=st.session_state[DENSITY_LOW_THRESHOLD_KEY],
-            step=5,
-            help="Cities below this percentage are colored green (low density)",
-            key=DENSITY_LOW_THRESHOLD_KEY,
-        )
-
-        st.slider(
-            "High Threshold (%)",
-            min_value=MIN_DENSITY_THRESHOLD,
-            max_value=MAX_DENSITY_THRESHOLD,
-            value=st.session_state[DENSITY_HIGH_THRESHOLD_KEY],
-            step=5,
-            help="Cities above this percentage are colored red (high density)",
-            key=DENSITY_HIGH_THRESHOLD_KEY,
-        )
-
-        # Get current threshold values for display
-        low_threshold = st.session_state[DENSITY_LOW_THRESHOLD_KEY]
-        high_threshold = st.session_state[DENSITY_HIGH_THRESHOLD_KEY]
+    # Sliders sit in a form so a batch of adjustments is applied (and
+    # queried) once on submit rather than once per widget change
+    analysis_code = H3_ANALYSIS_TYPES[analysis_type]
+    if analysis_code in ("coverage", "density"):
+        with st.form("h3_controls", clear_on_submit=False):
+            if analysis_code == "coverage":
+                # Coverage radius for Station Coverage
+                st.slider(
+                    "Coverage Radius (km)",
+                    min_value=MIN_COVERAGE_RADIUS_KM,
+                    max_value=MAX_COVERAGE_RADIUS_KM,
+                    value=coverage_radius,
+                    step=0.5,
+                    help="Radius around each station considered as covered",
+                    key=COVERAGE_RADIUS_KEY,
+                )
 
-        st.caption(f"🟢 Low: 0-{low_threshold}%")
-        st.caption(f"🟡 Medium: {low_threshold}-{high_threshold}%")
-        st.caption(f"🔴 High: {high_threshold}-100%")
-
-    # Return all values from session state
+            elif analysis_code == "density":
+                # City icons checkbox for City Density Heatmap
+                # Debug: Show state BEFORE checkbox
+                if DEBUG:
+                    st.caption(f"🔍 Before checkbox - Session state: {show_city_icons}, Default: {DEFAULT_SHOW_CITY_ICONS}")
+
+                current_value = st.checkbox(
+                    "Show City Icons",
+                    help="Display city location markers on the map",
+                    key=SHOW_CITY_ICONS_KEY,
+                )
+
+                # Debug: Show the value immediately after checkbox
+                if DEBUG:
+                    st.caption(f"⚙️ After checkbox - Current value: {current_value}")
+
+                st.markdown("**Density Thresholds**")
+                st.caption("Percentage of maximum city count")
+
+                st.slider(
+                    "Low Threshold (%)",
+                    min_value=MIN_DENSITY_THRESHOLD,
+                    max_value=MAX_DENSITY_THRESHOLD,
+                    value=low_threshold,
+                    step=5,
+                    help="Cities below this percentage are colored green (low density)",
+                    key=DENSITY_LOW_THRESHOLD_KEY,
+                )
+
+                st.slider(
+                    "High Threshold (%)",
+                    min_value=MIN_DENSITY_THRESHOLD,
+                    max_value=MAX_DENSITY_THRESHOLD,
+                    value=high_threshold,
+                    step=5,
+                    help="Cities above this percentage are colored red (high density)",
+                    key=DENSITY_HIGH_THRESHOLD_KEY,
+                )
+
+                st.caption(f"🟢 Low: 0-{low_threshold}%")
+                st.caption(f"🟡 Medium: {low_threshold}-{high_threshold}%")
+                st.caption(f"🔴 High: {high_threshold}-100%")
+
+            st.form_submit_button("Apply", use_container_width=True)
+
+    # Return the values read from session state
     return (
-        st.session_state[ANALYSIS_TYPE_KEY],
-        st.session_state[RESOLUTION_KEY],
-        st.session_state.get(COVERAGE_RADIUS_KEY, DEFAULT_COVERAGE_RADIUS_KM),
-        st.session_state.get(DENSITY_LOW_THRESHOLD_KEY, DEFAULT_DENSITY_LOW_THRESHOLD),
-        st.session_state.get(DENSITY_HIGH_THRESHOLD_KEY, DEFAULT_DENSITY_HIGH_THRESHOLD),
-        st.session_state.get(SHOW_CITY_ICONS_KEY, DEFAULT_SHOW_CITY_ICONS),
+        analysis_type,
+        resolution,
+        coverage_radius,
+        low_threshold,
+        high_threshold,
+        show_city_icons,
     )
 
 
@@ -250,23 +280,34 @@ def _render_resolution_info(resolution: int) -> None:
     Args:
         resolution: Current H3 resolution value
     """
-    # Resolution descriptions
-    resolution_info = {
-        3: "広域（州レベル）- 地域密度分析に適しています",
-        4: "広域（州レベル）- 地域密度分析に適しています",
-        5: "広域（州レベル）- 地域密度分析に適しています",
-        6: "中域（市レベル）- 都市計画に適しています",
-        7: "中域（市レベル）- 都市計画に適しています",
-        8: "狭域（地区レベル）- 店舗カバレッジ分析に適しています",
-    }
-
-    info_text = resolution_info.get(
+    info_text = _RESOLUTION_INFO.get(
         resolution, "解像度が高いほど、詳細な分析が可能ですが計算量も増加します"
     )
 
     st.info(f"**Resolution {resolution}**: {info_text}")
 
 
+def _get_map_deck(deck_key: Tuple, build_deck: Callable[[], pydeck.Deck]) -> pydeck.Deck:
+    """Return the analysis deck, rebuilding it only when its inputs change.
+
+    The last deck is kept in session state keyed by the analysis settings,
+    data sizes and data version, so reruns with unchanged settings skip the
+    layer building.
+
+    Args:
+        deck_key: Analysis type, settings and data sizes the deck depends on
+        build_deck: Builds the deck when the key differs from the last one
+    """
+    deck_key = (*deck_key, get_data_version())
+    cached = st.session_state.get(MAP_DECK_KEY)
+    if cached is not None and cached[0] == deck_key:
+        return cached[1]
+
+    deck = build_deck()
+    st.session_state[MAP_DECK_KEY] = (deck_key, deck)
+    return deck
+
+
 def _render_grid_visualization(session, resolution: int) -> None:
     """Render H3 grid visualization.
 
@@ -293,19 +334,23 @@ def _render_grid_visualization(session, resolution: int) -> None:
     with col2:
         st.metric("H3 Resolution", resolution)
     with col3:
-        # Show sample H3 cell ID for debugging
-        if not df_h3.empty and 'H3_CELL' in df_h3.columns:
-            sample_cell = str(df_h3['H3_CELL'].iloc[0])
-            st.metric("Sample Cell", f"{sample_cell[:8]}...")
+        # Show sample H3 cell ID (the loader always returns H3_CELL and the
+        # empty case has already returned above)
+        sample_cell = str(df_h3["H3_CELL"].iat[0])
+        st.metric("Sample Cell", f"{sample_cell[:8]}...")
 
     # Debug: Show data sample
-    with st.expander("🔍 Debug: Data Sample"):
-        st.write(f"DataFrame shape: {df_h3.shape}")
-        st.write(f"Columns: {df_h3.columns.tolist()}")
-        st.dataframe(df_h3.head(10))
+    if DEBUG:
+        with st.expander("🔍 Debug: Data Sample"):
+            st.write(f"DataFrame shape: {df_h3.shape}")
+            st.write(f"Columns: {df_h3.columns.tolist()}")
+            st.dataframe(df_h3.head(10))
 
     # Render map
-    deck = build_h3_grid_deck(df_h3, resolution)
+    deck = _get_map_deck(
+        ("grid", resolution, len(df_h3)),
+        partial(build_h3_grid_deck, df_h3, resolution),
+    )
     st.pydeck_chart(deck, use_container_width=True)
 
     # Educational notes
@@ -345,8 +390,10 @@ def _render_density_heatmap(
     _render_resolution_info(resolution)
 
     with st.spinner("Loading city density data..."):
-        df_density = load_h3_density_data(session, resolution)
-        df_cities = load_city_locations(session)
+        df_density, df_cities = run_concurrently(
+            partial(load_h3_density_data, session, resolution),
+            partial(load_city_locations, session),
+        )
 
     if df_density.empty:
         st.warning("No density data available.")
@@ -366,18 +413,26 @@ def _render_density_heatmap(
         st.metric("Avg Cities per Cell", f"{stats['avg_cities_per_cell']:.2f}")
 
     # Debug: Show current settings
-    with st.expander("🔍 Debug: Current Settings"):
-        st.write(f"Show City Icons (from parameter): {show_city_icons}")
-        st.write(f"Show City Icons (from session state): {st.session_state.get(SHOW_CITY_ICONS_KEY, 'NOT SET')}")
-        st.write(f"Low Threshold: {low_threshold}%")
-        st.write(f"High Threshold: {high_threshold}%")
-        st.write(f"Cities DataFrame shape: {df_cities.shape}")
-        st.write(f"Density DataFrame shape: {df_density.shape}")
-        st.write(f"Map key: density_map_{resolution}_{low_threshold}_{high_threshold}_{show_city_icons}")
+    if DEBUG:
+        with st.expander("🔍 Debug: Current Settings"):
+            st.write(f"Show City Icons (from parameter): {show_city_icons}")
+            st.write(f"Show City Icons (from session state): {st.session_state.get(SHOW_CITY_ICONS_KEY, 'NOT SET')}")
+            st.write(f"Low Threshold: {low_threshold}%")
+            st.write(f"High Threshold: {high_threshold}%")
+            st.write(f"Cities DataFrame shape: {df_cities.shape}")
+            st.write(f"Density DataFrame shape: {df_density.shape}")
+            st.write(f"Map key: density_map_{resolution}_{low_threshold}_{high_threshold}_{show_city_icons}")
 
     # Render map with custom thresholds and optional city icons
-    deck = build_h3_density_deck(
-        df_density, df_cities, resolution, low_threshold, high_threshold, show_city_icons
+    deck = _get_map_deck(
+        (
+            "density", resolution, low_threshold, high_threshold, show_city_icons,
+            len(df_density), len(df_cities),
+        ),
+        partial(
+            build_h3_density_deck,
+            df_density, df_cities, resolution, low_threshold, high_threshold, show_city_icons,
+        ),
     )
     # Use a unique key based on settings to force re-render when settings change
     map_key = f"density_map_{resolution}_{low_threshold}_{high_threshold}_{show_city_icons}"
@@ -425,8 +480,10 @@ def _render_coverage_analysis(session, resolution: int, radius_km: float) -> Non
     _render_resolution_info(resolution)
 
     with st.spinner("Calculating station coverage..."):
-        df_coverage = load_h3_coverage_data(session, resolution, radius_km)
-        df_stations = load_station_locations(session)
+        df_coverage, df_stations = run_concurrently(
+            partial(load_h3_coverage_data, session, resolution, radius_km),
+            partial(load_station_locations, session),
+        )
 
     if df_coverage.empty:
         st.warning("No coverage data available.")
@@ -446,7 +503,10 @@ def _render_coverage_analysis(session, resolution: int, radius_km: float) -> Non
         st.metric("Coverage Rate", f"{stats['coverage_rate']:.1f}%")
 
     # Render map
-    deck = build_h3_coverage_deck(df_coverage, df_stations, resolution, radius_km)
+    deck = _get_map_deck(
+        ("coverage", resolution, radius_km, len(df_coverage), len(df_stations)),
+        partial(build_h3_coverage_deck, df_coverage, df_stations, resolution, radius_km),
+    )
     st.pydeck_chart(deck, use_container_width=True)
 
     # Legend
@@ -469,20 +529,16 @@ def _render_coverage_analysis(session, resolution: int, radius_km: float) -> Non
         )
 
 
-def build_h3_index_demo_page() -> None:
-    """Main application logic."""
-    _ensure_session_state()
-    _render_header()
-    _render_demo_overview()
+@st.fragment
+def _render_analysis_section(session) -> None:
+    """Render the settings panel and the selected analysis.
 
-    # Get Snowflake session
-    try:
-        session = get_active_session()
-    except Exception as e:
-        st.error(f"Failed to connect to Snowflake: {e}")
-        logger.error(f"Snowflake connection error: {e}")
-        return
+    Runs as a fragment, so changing a setting reruns only this section
+    instead of the header, overview and footer around it.
 
+    Args:
+        session: Snowflake session object
+    """
     # Create two-column layout: 1/3 for settings, 2/3 for visualization
     settings_col, viz_col = st.columns([1, 2])
 
@@ -508,6 +564,23 @@ def build_h3_index_demo_page() -> None:
             st.error(f"Error during analysis: {e}")
             logger.error(f"Analysis error ({analysis_type}): {e}", exc_info=True)
 
+
+def build_h3_index_demo_page() -> None:
+    """Main application logic."""
+    _ensure_session_state()
+    _render_header()
+    _render_demo_overview()
+
+    # Get Snowflake session (cached resource shared across reruns)
+    try:
+        session = create_session()
+    except Exception as e:
+        st.error(f"Failed to connect to Snowflake: {e}")
+        logger.error(f"Snowflake connection error: {e}")
+        return
+
+    _render_analysis_section(session)
+
     # Footer
     st.divider()
     st.markdown(
@@ -516,6 +589,7 @@ def build_h3_index_demo_page() -> None:
         このデモでは以下の Snowflake H3 関数を使用しています:
         - `H3_POINT_TO_CELL(geography, resolution)` - 地点をH3セルに変換
         - `H3_CELL_TO_BOUNDARY(h3_cell)` - H3セルの境界ポリゴンを取得
+        - `H3_GRID_DISK(h3_cell, k)` - 指定距離 k 以内の近傍セルを取得
         - `ST_BUFFER(geography, distance)` - 地点周辺のバッファゾーン作成
         - `ST_INTERSECTS(geo1, geo2)` - 地理オブジェクトの交差判定
 